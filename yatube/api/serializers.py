@@ -0,0 +1,100 @@
+from django.core.files.storage import default_storage
+
+AUTHOR = {
+    'id': 'author_id',
+    'username': 'author__username',
+    'first_name': 'author__first_name',
+    'last_name': 'author__last_name',
+}
+GROUP = {
+    'id': 'group_id',
+    'slug': 'group__slug',
+    'title': 'group__title',
+}
+
+
+def media_url(name):
+    return default_storage.url(name) if name else None
+
+
+class Serializer:
+    """
+    Описание выдачи модели: имя поля - колонка для values() или словарь
+    колонок вложенного объекта. Строки берутся одним запросом с JOIN
+    связанных таблиц, объекты моделей при этом не создаются.
+    """
+
+    def __init__(self, fields, converters=None):
+        self.fields = fields
+        self.converters = converters or {}
+
+    def select(self, requested):
+        """
+        Поля из параметра ?fields=a,b в порядке запроса, без него -
+        все. Для неизвестных полей поднимается KeyError с их списком.
+        """
+        if not requested:
+            return list(self.fields)
+        names = [name.strip() for name in requested.split(',')]
+        names = list(dict.fromkeys(name for name in names if name))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise KeyError(', '.join(unknown))
+        return names or list(self.fields)
+
+    def columns(self, names, extra=()):
+        """Колонки для values(): поля выдачи и, например, ключ сортировки."""
+        columns = list(extra)
+        for name in names:
+            spec = self.fields[name]
+            if isinstance(spec, dict):
+                columns.extend(spec.values())
+            else:
+                columns.append(spec)
+        return list(dict.fromkeys(columns))
+
+    def item(self, row, names):
+        data = {}
+        for name in names:
+            spec = self.fields[name]
+            if isinstance(spec, dict):
+                value = {key: row[column] for key, column in spec.items()}
+                if value['id'] is None:
+                    value = None
+            else:
+                value = row[spec]
+                if name in self.converters:
+                    value = self.converters[name](value)
+            data[name] = value
+        return data
+
+
+POSTS = Serializer(
+    {
+        'id': 'id',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'image': 'image',
+        'comments_count': 'comments_count',
+        'author': AUTHOR,
+        'group': GROUP,
+    },
+    converters={'image': media_url},
+)
+GROUPS = Serializer({
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+})
+COMMENTS = Serializer({
+    'id': 'id',
+    'post': 'post_id',
+    'text': 'text',
+    'created': 'created',
+    'author': AUTHOR,
+})
+FOLLOWS = Serializer({
+    'id': 'id',
+    'author': AUTHOR,
+})
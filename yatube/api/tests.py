@@ -0,0 +1,169 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='Stanley', first_name='Стэнли'
+        )
+        cls.reader = User.objects.create_user(username='Phyllis')
+        cls.group = Group.objects.create(
+            title='Продажи', slug='sales', description='-'
+        )
+        for number in range(25):
+            Post.objects.create(
+                text=f'Пост {number}',
+                author=cls.author,
+                group=cls.group if number % 2 else None,
+            )
+        cls.post = Post.objects.latest('pub_date', 'id')
+
+    def send(self, method, url, data):
+        return getattr(self.client, method)(
+            url, json.dumps(data), content_type='application/json'
+        )
+
+    def test_posts_list_is_paginated_by_cursor(self):
+        url = reverse('api:posts')
+        with self.assertNumQueries(1):
+            first = self.client.get(url).json()
+        self.assertEqual(len(first['results']), 20)
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(second['results']), 5)
+        self.assertIsNone(second['next'])
+        ids = [item['id'] for item in first['results'] + second['results']]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+    def test_embedded_author_and_group(self):
+        item = self.client.get(
+            reverse('api:post', args=[self.post.pk])
+        ).json()
+        self.assertEqual(item['author'], {
+            'id': self.author.pk,
+            'username': 'Stanley',
+            'first_name': 'Стэнли',
+            'last_name': '',
+        })
+        group = self.group if self.post.group_id else None
+        self.assertEqual(item['group'] and item['group']['slug'],
+                         group and group.slug)
+        self.assertIsNone(item['image'])
+
+    def test_sparse_fieldsets(self):
+        response = self.client.get(
+            reverse('api:posts'), {'fields': 'id,text', 'limit': 3}
+        )
+        self.assertEqual(
+            [set(item) for item in response.json()['results']],
+            [{'id', 'text'}] * 3,
+        )
+        response = self.client.get(reverse('api:posts'), {'fields': 'secret'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_filters(self):
+        response = self.client.get(
+            reverse('api:posts'), {'group': 'sales', 'limit': 100}
+        )
+        self.assertEqual(len(response.json()['results']), 12)
+
+    def test_anonymous_cannot_write(self):
+        response = self.send('post', reverse('api:posts'), {'text': 'Нет'})
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get(reverse('api:follows'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_create_post(self):
+        self.client.force_login(self.reader)
+        response = self.send(
+            'post', reverse('api:posts'),
+            {'text': 'Из приложения', 'group': self.group.pk},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['author']['username'], 'Phyllis')
+        self.assertTrue(Post.objects.filter(
+            text='Из приложения', author=self.reader, group=self.group
+        ).exists())
+        response = self.send('post', reverse('api:posts'), {'text': ''})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('text', response.json()['fields'])
+
+    def test_only_author_edits_post(self):
+        url = reverse('api:post', args=[self.post.pk])
+        self.client.force_login(self.reader)
+        self.assertEqual(
+            self.send('patch', url, {'text': 'Чужое'}).status_code, 403
+        )
+        self.assertEqual(self.client.delete(url).status_code, 403)
+        self.client.force_login(self.author)
+        response = self.send('patch', url, {'text': 'Исправлено'})
+        self.assertEqual(response.json()['text'], 'Исправлено')
+        self.assertEqual(
+            Post.objects.get(pk=self.post.pk).group_id, self.post.group_id
+        )
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+
+    def test_form_encoded_patch(self):
+        url = reverse('api:post', args=[self.post.pk])
+        self.client.force_login(self.author)
+        response = self.client.patch(
+            url, 'text=%D0%A4%D0%BE%D1%80%D0%BC%D0%B0',
+            content_type='application/x-www-form-urlencoded',
+        )
+        self.assertEqual(response.json()['text'], 'Форма')
+        response = self.client.patch(url, 'text', content_type='text/plain')
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(Post.objects.get(pk=self.post.pk).text, 'Форма')
+
+    def test_comments(self):
+        url = reverse('api:comments', args=[self.post.pk])
+        self.client.force_login(self.reader)
+        response = self.send('post', url, {'text': 'Согласна'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Comment.objects.filter(post=self.post).count(), 1)
+        items = self.client.get(url).json()['results']
+        self.assertEqual(items[0]['text'], 'Согласна')
+        self.assertEqual(items[0]['post'], self.post.pk)
+
+    def test_groups(self):
+        response = self.client.get(reverse('api:group', args=['sales']))
+        self.assertEqual(response.json()['title'], 'Продажи')
+        response = self.client.get(reverse('api:group', args=['none']))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(
+            len(self.client.get(reverse('api:groups')).json()['results']), 1
+        )
+
+    def test_follows(self):
+        self.client.force_login(self.reader)
+        url = reverse('api:follows')
+        response = self.send('post', url, {'author': 'Stanley'})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.send('post', url, {'author': 'Stanley'})
+                         .status_code, 200)
+        self.assertEqual(
+            self.send('post', url, {'author': 'Phyllis'}).status_code, 400
+        )
+        items = self.client.get(url).json()['results']
+        self.assertEqual(items[0]['author']['username'], 'Stanley')
+        response = self.client.delete(
+            reverse('api:follow', args=['Stanley'])
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(Follow.objects.filter(user=self.reader).exists())
+
+    def test_unsupported_method(self):
+        response = self.client.delete(reverse('api:groups'))
+        self.assertEqual(response.status_code, 405)
+        self.assertIn('GET', response['Allow'])
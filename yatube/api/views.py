@@ -0,0 +1,246 @@
+import json
+from functools import wraps
+
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, HttpResponse, JsonResponse, QueryDict
+from django.shortcuts import get_object_or_404
+
+from core import write_queue
+from posts import follows, images
+from posts.forms import CommentForm, PostForm
+from posts.models import Comment, Follow, Group, Post, User
+from posts.paginators import CursorPaginator
+from yatube.settings import API_MAX_PAGE_SIZE, API_PAGE_SIZE
+
+from .serializers import COMMENTS, FOLLOWS, GROUPS, POSTS
+
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, **details):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.details = details
+
+
+def error_response(status, message, **details):
+    return JsonResponse({'error': message, **details}, status=status)
+
+
+def api_view(*methods):
+    """
+    Разрешенные методы view; изменять данные может только вошедший
+    пользователь. Ошибки отдаются в JSON, а не страницами сайта.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                response = error_response(405, 'Метод не поддерживается')
+                response['Allow'] = ', '.join(methods)
+                return response
+            try:
+                if (request.method not in SAFE_METHODS
+                        and not request.user.is_authenticated):
+                    raise ApiError(401, 'Нужно войти')
+                return view(request, *args, **kwargs)
+            except ApiError as error:
+                return error_response(
+                    error.status, error.message, **error.details
+                )
+            except Http404:
+                return error_response(404, 'Не найдено')
+            except PermissionDenied:
+                return error_response(403, 'Недостаточно прав')
+        return wrapper
+    return decorator
+
+
+def _fields(request, serializer):
+    try:
+        return serializer.select(request.GET.get('fields'))
+    except KeyError as error:
+        raise ApiError(400, 'Неизвестные поля', fields=error.args[0])
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', API_PAGE_SIZE))
+    except ValueError:
+        raise ApiError(400, 'Параметр limit должен быть числом')
+    return min(max(limit, 1), API_MAX_PAGE_SIZE)
+
+
+def _link(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return request.build_absolute_uri('?' + query.urlencode())
+
+
+def page_response(request, queryset, serializer, ordering):
+    """
+    Страница списка по курсору. Из базы читаются только колонки
+    запрошенных полей и ключ сортировки, COUNT(*) не выполняется.
+    """
+    names = _fields(request, serializer)
+    keys = [name.lstrip('-') for name in ordering]
+    paginator = CursorPaginator(
+        queryset.values(*serializer.columns(names, keys)),
+        _limit(request),
+        ordering,
+    )
+    page = paginator.get_page(request.GET.get('cursor'))
+    return JsonResponse({
+        'results': [serializer.item(row, names) for row in page],
+        'next': _link(request, page.next_cursor),
+        'previous': _link(request, page.previous_cursor),
+    })
+
+
+def detail(request, queryset, serializer):
+    names = _fields(request, serializer)
+    row = queryset.values(*serializer.columns(names)).first()
+    if row is None:
+        raise Http404
+    return serializer.item(row, names)
+
+
+def _data(request):
+    """
+    Тело запроса: JSON или обычная форма. Django разбирает форму только
+    в POST, для PATCH urlencoded-тело читается отдельно.
+    """
+    if request.content_type != 'application/json':
+        if request.method == 'POST':
+            return request.POST
+        if request.content_type == 'application/x-www-form-urlencoded':
+            return QueryDict(request.body, encoding=request.encoding)
+        raise ApiError(415, 'Ожидается JSON или urlencoded-форма')
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ApiError(400, 'Некорректный JSON')
+    if not isinstance(data, dict):
+        raise ApiError(400, 'Ожидается JSON-объект')
+    return data
+
+
+def _validate(form):
+    if not form.is_valid():
+        raise ApiError(400, 'Ошибка в данных', fields={
+            name: [str(message) for message in messages]
+            for name, messages in form.errors.items()
+        })
+
+
+@api_view('GET', 'HEAD', 'POST')
+def posts(request):
+    if request.method == 'POST':
+        form = PostForm(_data(request), request.FILES or None)
+        _validate(form)
+        new_post = form.save(commit=False)
+        new_post.author = request.user
+        new_post.save()
+        if new_post.image:
+            images.schedule(new_post)
+        return JsonResponse(detail(
+            request, Post.objects.filter(pk=new_post.pk), POSTS
+        ), status=201)
+    queryset = Post.objects.all()
+    if request.GET.get('group'):
+        queryset = queryset.filter(group__slug=request.GET['group'])
+    if request.GET.get('author'):
+        queryset = queryset.filter(author__username=request.GET['author'])
+    return page_response(request, queryset, POSTS, ('-pub_date', '-id'))
+
+
+@api_view('GET', 'HEAD', 'PATCH', 'DELETE')
+def post(request, post_id):
+    if request.method in SAFE_METHODS:
+        return JsonResponse(
+            detail(request, Post.objects.filter(pk=post_id), POSTS)
+        )
+    editable_post = get_object_or_404(Post, id=post_id)
+    if request.user != editable_post.author:
+        raise PermissionDenied
+    if request.method == 'DELETE':
+        editable_post.delete()
+        return HttpResponse(status=204)
+    data = {'text': editable_post.text, 'group': editable_post.group_id}
+    data.update(_data(request).items())
+    form = PostForm(data, instance=editable_post)
+    _validate(form)
+    form.save()
+    return JsonResponse(
+        detail(request, Post.objects.filter(pk=post_id), POSTS)
+    )
+
+
+@api_view('GET', 'HEAD', 'POST')
+def comments(request, post_id):
+    commented_post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    if request.method == 'POST':
+        form = CommentForm(_data(request))
+        _validate(form)
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post = commented_post
+        write_queue.run(comment.save)
+        return JsonResponse(detail(
+            request, Comment.objects.filter(pk=comment.pk), COMMENTS
+        ), status=201)
+    return page_response(
+        request,
+        Comment.objects.filter(post_id=commented_post.pk),
+        COMMENTS,
+        ('-created', '-id'),
+    )
+
+
+@api_view('GET', 'HEAD')
+def groups(request):
+    return page_response(request, Group.objects.all(), GROUPS, ('id',))
+
+
+@api_view('GET', 'HEAD')
+def group(request, slug):
+    return JsonResponse(
+        detail(request, Group.objects.filter(slug=slug), GROUPS)
+    )
+
+
+@api_view('GET', 'HEAD', 'POST')
+def follow_list(request):
+    """Подписки текущего пользователя."""
+    if not request.user.is_authenticated:
+        raise ApiError(401, 'Нужно войти')
+    if request.method == 'POST':
+        username = _data(request).get('author')
+        if not username:
+            raise ApiError(400, 'Не указан автор')
+        writer = get_object_or_404(User, username=username)
+        if writer == request.user:
+            raise ApiError(400, 'Нельзя подписаться на себя')
+        created = write_queue.run(follows.follow, request.user.pk, writer.pk)
+        return JsonResponse(
+            detail(
+                request,
+                Follow.objects.filter(user=request.user, author=writer),
+                FOLLOWS,
+            ),
+            status=201 if created else 200,
+        )
+    return page_response(
+        request, Follow.objects.filter(user=request.user), FOLLOWS, ('-id',)
+    )
+
+
+@api_view('DELETE')
+def follow(request, username):
+    writer = get_object_or_404(User.objects.only('id'), username=username)
+    write_queue.run(follows.unfollow, request.user.pk, writer.pk)
+    return HttpResponse(status=204)
@@ -0,0 +1,64 @@
+import math
+import random
+import time
+import uuid
+
+from django.core.cache import cache
+
+from yatube.settings import CACHE_LOCK_TIMEOUT, CACHE_LOCK_WAIT
+
+from . import metrics
+
+
+def _lock_key(key):
+    return f'lock:{key}'
+
+
+def _wait_for(key, deadline):
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_compute(key, compute, timeout, beta=1.0):
+    """
+    Значение из кэша с защитой от лавины промахов.
+
+    Пересчитывает значение только тот процесс, который взял блокировку
+    (cache.add атомарен в общем кэше); остальные отдают старое значение
+    или ждут свежее до CACHE_LOCK_WAIT секунд. Незадолго до истечения
+    срока значение с некоторой вероятностью пересчитывается заранее
+    (probabilistic early expiration): чем дольше пересчет и больше beta,
+    тем раньше.
+    """
+    entry = cache.get(key)
+    metrics.cache_hit(entry is not None)
+    lock, token = _lock_key(key), uuid.uuid4().hex
+    if entry is not None:
+        value, delta, expiry = entry
+        jitter = -delta * beta * math.log(1 - random.random())
+        if time.time() + jitter < expiry:
+            return value
+        if not cache.add(lock, token, CACHE_LOCK_TIMEOUT):
+            return value
+        locked = True
+    else:
+        locked = cache.add(lock, token, CACHE_LOCK_TIMEOUT)
+        if not locked:
+            entry = _wait_for(key, time.monotonic() + CACHE_LOCK_WAIT)
+            if entry is not None:
+                return entry[0]
+    try:
+        start = time.monotonic()
+        value = compute()
+        delta = time.monotonic() - start
+        cache.set(key, (value, delta, time.time() + timeout), timeout)
+    finally:
+        # Не дождавшийся процесс считает сам, но чужую блокировку не
+        # снимает: иначе следующий начал бы еще один пересчет.
+        if locked and cache.get(lock) == token:
+            cache.delete(lock)
+    return value
@@ -0,0 +1,45 @@
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from yatube.settings import TASKS_EMAIL_BACKEND
+
+from .tasks import task
+
+
+def _serialize(message):
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+    }
+
+
+@task(sensitive=True)
+def send_email(data):
+    data['alternatives'] = [tuple(item) for item in data['alternatives']]
+    message = EmailMultiAlternatives(**data)
+    get_connection(TASKS_EMAIL_BACKEND).send_messages([message])
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Ставит письма в очередь задач, запрос не ждет почтовый сервер.
+    Письма с вложениями отправляются сразу: вложения не хранятся в
+    очереди.
+    """
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            if message.attachments:
+                get_connection(
+                    TASKS_EMAIL_BACKEND, fail_silently=self.fail_silently
+                ).send_messages([message])
+            else:
+                send_email.delay(_serialize(message))
+        return len(email_messages)
@@ -0,0 +1,67 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from core import tasks
+from yatube.settings import TASKS_BATCH_SIZE, TASKS_POLL_INTERVAL
+
+
+def work(batch_size, poll_interval, once):
+    """
+    Цикл воркера: пачка задач, а если очередь пуста - чистка старых
+    упавших задач и пауза.
+    """
+    while True:
+        close_old_connections()
+        claimed = tasks.run_pending(batch_size)
+        if not claimed:
+            tasks.purge_failed()
+            if once:
+                return
+            time.sleep(poll_interval)
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры очереди фоновых задач'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Число процессов-воркеров',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=TASKS_BATCH_SIZE,
+            help='Сколько задач воркер забирает за раз',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=TASKS_POLL_INTERVAL,
+            help='Пауза в секундах, когда очередь пуста',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить все готовые задачи и выйти',
+        )
+
+    def handle(self, *args, **options):
+        arguments = (
+            options['batch_size'], options['poll_interval'], options['once']
+        )
+        if options['processes'] <= 1:
+            work(*arguments)
+            return
+        # Дочерние процессы не должны делить соединения с родителем.
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=work, args=arguments, daemon=True)
+            for _ in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
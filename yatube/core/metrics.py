@@ -0,0 +1,146 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from yatube.settings import METRICS_BUCKETS
+
+_local = threading.local()
+_lock = threading.Lock()
+
+COUNTERS = {
+    'db_queries': ('yatube_db_queries_total', 'SQL-запросы'),
+    'db_time': ('yatube_db_duration_seconds_total', 'Время SQL-запросов'),
+    'template_time': (
+        'yatube_template_duration_seconds_total', 'Время отрисовки шаблонов'
+    ),
+    'cache_hits': ('yatube_cache_hits_total', 'Попадания в кэш'),
+    'cache_misses': ('yatube_cache_misses_total', 'Промахи кэша'),
+}
+
+
+class RequestMetrics:
+    """Счетчики одного запроса, их заполняют обертки базы и шаблонов."""
+
+    __slots__ = tuple(COUNTERS)
+
+    def __init__(self):
+        for name in COUNTERS:
+            setattr(self, name, 0)
+
+
+class Histogram:
+    """Накопительная гистограмма в формате Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+_latency = {}
+_totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+
+
+def current():
+    """Счетчики текущего запроса или None вне запроса."""
+    return getattr(_local, 'metrics', None)
+
+
+def start():
+    _local.metrics = RequestMetrics()
+    return _local.metrics
+
+
+def stop():
+    _local.metrics = None
+
+
+def cache_hit(hit=True):
+    metrics = current()
+    if metrics is not None:
+        if hit:
+            metrics.cache_hits += 1
+        else:
+            metrics.cache_misses += 1
+
+
+def db_wrapper(execute, sql, params, many, context):
+    """Обертка connection.execute_wrapper: число и время запросов."""
+    metrics = current()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.db_queries += 1
+
+
+def record(view, duration, metrics):
+    with _lock:
+        histogram = _latency.get(view)
+        if histogram is None:
+            histogram = _latency[view] = Histogram(METRICS_BUCKETS)
+        histogram.observe(duration)
+        totals = _totals[view]
+        for name in COUNTERS:
+            totals[name] += getattr(metrics, name)
+
+
+def reset():
+    with _lock:
+        _latency.clear()
+        _totals.clear()
+
+
+def _label(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Все метрики процесса в текстовом формате Prometheus."""
+    with _lock:
+        latency = {
+            view: (list(histogram.counts), histogram.sum)
+            for view, histogram in _latency.items()
+        }
+        totals = {view: dict(values) for view, values in _totals.items()}
+    lines = [
+        '# HELP yatube_request_duration_seconds Время ответа по view',
+        '# TYPE yatube_request_duration_seconds histogram',
+    ]
+    for view, (counts, total) in sorted(latency.items()):
+        label = _label(view)
+        cumulative = 0
+        for bound, count in zip(METRICS_BUCKETS + ('+Inf',), counts):
+            cumulative += count
+            lines.append(
+                f'yatube_request_duration_seconds_bucket'
+                f'{{view="{label}",le="{bound}"}} {cumulative}'
+            )
+        lines.append(
+            f'yatube_request_duration_seconds_sum{{view="{label}"}} '
+            f'{_number(total)}'
+        )
+        lines.append(
+            f'yatube_request_duration_seconds_count{{view="{label}"}} '
+            f'{cumulative}'
+        )
+    for name, (metric, help_text) in COUNTERS.items():
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for view, values in sorted(totals.items()):
+            lines.append(
+                f'{metric}{{view="{_label(view)}"}} {_number(values[name])}'
+            )
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,83 @@
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from yatube.settings import METRICS_SERVER_TIMING, REPLICA_STICKY_SECONDS
+
+from . import metrics, routers
+
+PRIMARY_UNTIL = 'primary_until'
+
+
+class MetricsMiddleware:
+    """
+    Считает для каждого запроса SQL-запросы и их время, время шаблонов,
+    попадания в кэш и общее время ответа. Итоги копятся по имени view
+    для /metrics и отдаются клиенту в заголовке Server-Timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.start()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.db_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.stop()
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        metrics.record(view, duration, request_metrics)
+        if METRICS_SERVER_TIMING:
+            response['Server-Timing'] = self.server_timing(
+                duration, request_metrics
+            )
+        return response
+
+    @staticmethod
+    def server_timing(duration, request_metrics):
+        return ', '.join((
+            'db;dur={:.1f};desc="{} queries"'.format(
+                request_metrics.db_time * 1000, request_metrics.db_queries
+            ),
+            'tpl;dur={:.1f}'.format(request_metrics.template_time * 1000),
+            'cache;desc="{} hits, {} misses"'.format(
+                request_metrics.cache_hits, request_metrics.cache_misses
+            ),
+            'total;dur={:.1f}'.format(duration * 1000),
+        ))
+
+
+class ReplicaMiddleware:
+    """
+    Разрешает читать с реплик в GET-запросах. После запроса, который
+    записал данные, сессия на REPLICA_STICKY_SECONDS секунд закрепляется
+    за основной базой, чтобы пользователь сразу увидел свой пост или
+    комментарий, даже если реплика отстает.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned = request.session.get(PRIMARY_UNTIL, 0) > time.time()
+        routers.start(
+            request.method in ('GET', 'HEAD') and not pinned
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = routers.stop()
+        if wrote:
+            request.session[PRIMARY_UNTIL] = (
+                time.time() + REPLICA_STICKY_SECONDS
+            )
+        return response
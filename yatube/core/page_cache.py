@@ -0,0 +1,171 @@
+import datetime as dt
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.urls import resolve
+from django.utils.cache import (get_conditional_response,
+                                patch_cache_control, patch_vary_headers)
+from django.utils.http import parse_http_date_safe
+from django.utils.translation import get_language
+
+from yatube.settings import PAGE_CACHE_TIMEOUT
+
+from . import metrics
+
+# Ключ, которым помечена каждая закэшированная страница.
+ALL = 'pages'
+
+MODIFIED_KEY = 'surrogate:modified'
+
+SKIPPED_HEADERS = {'set-cookie'}
+
+
+def tag(request, *keys):
+    """
+    Помечает ответ суррогатными ключами. Кэшируются только помеченные
+    страницы, и сбрасываются они вызовом purge с любым из ключей.
+    """
+    if not hasattr(request, 'surrogate_keys'):
+        request.surrogate_keys = {ALL}
+    request.surrogate_keys.update(str(key) for key in keys if key)
+
+
+def purge(*keys):
+    """
+    Делает устаревшими все страницы, помеченные любым из ключей.
+    Отметка изменения ставится до смены версий: страница, собранная
+    во время сброса, увидит ее и не попадет в кэш.
+    """
+    cache.set(MODIFIED_KEY, time.time(), None)
+    for key in filter(None, keys):
+        try:
+            cache.incr(_version_key(key))
+        except ValueError:
+            pass
+
+
+def _modified():
+    modified = cache.get(MODIFIED_KEY)
+    if modified is None:
+        cache.add(MODIFIED_KEY, time.time(), None)
+        modified = cache.get(MODIFIED_KEY)
+    return modified
+
+
+def last_modified():
+    """
+    Время последнего сброса любого ключа. Если отметка вытеснена из
+    кэша, ею становится текущее время: лишний полный ответ лучше
+    ложного 304. HTTP-даты точны до секунды, поэтому в течение секунды
+    после изменения время не отдается: следующее изменение в ту же
+    секунду оставило бы его прежним.
+    """
+    modified = _modified()
+    if time.time() < int(modified) + 1:
+        return None
+    return dt.datetime.fromtimestamp(int(modified), dt.timezone.utc)
+
+
+def _version_key(key):
+    return f'surrogate:{key}'
+
+
+def versions(keys):
+    """
+    Текущие версии ключей. Отсутствующая версия заводится как время в
+    миллисекундах, чтобы после вытеснения она не совпала со старой.
+    """
+    names = [_version_key(key) for key in keys]
+    versions = cache.get_many(names)
+    for name in names:
+        if name not in versions:
+            cache.add(name, int(time.time() * 1000), None)
+            versions[name] = cache.get(name)
+    return versions
+
+
+def _page_key(request):
+    raw = ':'.join((
+        request.get_host(), request.get_full_path(), get_language() or ''
+    ))
+    return 'page:' + hashlib.md5(raw.encode()).hexdigest()
+
+
+def _add_headers(response, keys):
+    response['Surrogate-Key'] = ' '.join(sorted(keys))
+    patch_cache_control(
+        response, public=True, max_age=0, s_maxage=PAGE_CACHE_TIMEOUT
+    )
+    patch_vary_headers(response, ('Cookie',))
+
+
+class PageCacheMiddleware:
+    """
+    Кэш целых страниц для анонимных посетителей. Страница хранится
+    вместе с версиями своих суррогатных ключей и считается устаревшей,
+    как только версия любого из них изменилась. Те же ключи уходят в
+    заголовке Surrogate-Key, чтобы так же мог чистить кэш прокси.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            response = self.get_response(request)
+            if getattr(request, 'surrogate_keys', None):
+                patch_cache_control(response, private=True)
+            return response
+        page_key = _page_key(request)
+        entry = cache.get(page_key)
+        if entry is not None and self.fresh(entry):
+            metrics.cache_hit(True)
+            request.resolver_match = resolve(request.path_info)
+            return self.restore(request, entry)
+        metrics.cache_hit(False)
+        # Версии ключей известны только после view, поэтому сброс во
+        # время сборки страницы ловится по отметке изменения.
+        modified = _modified()
+        response = self.get_response(request)
+        keys = getattr(request, 'surrogate_keys', None)
+        if (keys and response.status_code == 200
+                and not response.streaming and not response.cookies):
+            _add_headers(response, keys)
+            entry = self.entry(response, keys)
+            if cache.get(MODIFIED_KEY) == modified:
+                cache.set(page_key, entry, PAGE_CACHE_TIMEOUT)
+        return response
+
+    @staticmethod
+    def fresh(entry):
+        versions = entry['versions']
+        return cache.get_many(list(versions)) == versions
+
+    @staticmethod
+    def entry(response, keys):
+        return {
+            'versions': versions(keys),
+            'status': response.status_code,
+            'content': response.content,
+            'headers': [
+                (name, value) for name, value in response.items()
+                if name.lower() not in SKIPPED_HEADERS
+            ],
+        }
+
+    @staticmethod
+    def restore(request, entry):
+        response = HttpResponse(entry['content'], status=entry['status'])
+        for name, value in entry['headers']:
+            response[name] = value
+        return get_conditional_response(
+            request,
+            etag=response.get('ETag'),
+            last_modified=parse_http_date_safe(
+                response.get('Last-Modified', '')
+            ),
+            response=response,
+        )
@@ -0,0 +1,65 @@
+import random
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from yatube.settings import REPLICA_ALIASES, REPLICA_APPS
+
+_local = threading.local()
+
+
+def start(use_replica):
+    """Начало запроса: можно ли читать с реплик."""
+    _local.use_replica = use_replica
+    _local.wrote = False
+
+
+def stop():
+    """Конец запроса; возвращает True, если запрос что-то записал."""
+    wrote = getattr(_local, 'wrote', False)
+    _local.use_replica = False
+    _local.wrote = False
+    return wrote
+
+
+def mark_written():
+    """
+    Запись за запрос сделал другой поток (очередь записи): роутер ее не
+    видел, но чтение и сессию все равно нужно закрепить за основной
+    базой.
+    """
+    _local.use_replica = False
+    _local.wrote = True
+
+
+class ReplicaRouter:
+    """
+    Чтение моделей из REPLICA_APPS уходит на случайную реплику, но
+    только в GET-запросах, которые ReplicaMiddleware не закрепил за
+    основной базой. Запись всегда идет в основную базу и до конца
+    запроса переключает на нее и чтение.
+    """
+
+    def db_for_read(self, model, **hints):
+        if (REPLICA_ALIASES and getattr(_local, 'use_replica', False)
+                and model._meta.app_label in REPLICA_APPS
+                and not connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return random.choice(REPLICA_ALIASES)
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in REPLICA_APPS:
+            _local.use_replica = False
+            _local.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *REPLICA_ALIASES}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in REPLICA_ALIASES:
+            return False
+        return None
@@ -0,0 +1,14 @@
+from yatube.settings import SQLITE_PRAGMAS
+
+
+def configure(sender, connection, **kwargs):
+    """
+    Настраивает каждое новое соединение с SQLite: журнал WAL не дает
+    читателям ждать писателя, busy_timeout - ждать блокировку вместо
+    ошибки "database is locked".
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,152 @@
+import datetime as dt
+import json
+import logging
+import random
+import traceback
+import uuid
+from functools import partial
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from yatube.settings import (TASKS_BATCH_SIZE, TASKS_EAGER,
+                             TASKS_FAILED_RETENTION, TASKS_LOCK_TIMEOUT,
+                             TASKS_MAX_ATTEMPTS, TASKS_RETRY_DELAY,
+                             TASKS_RETRY_MAX_DELAY)
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+
+def task(func=None, *, max_attempts=TASKS_MAX_ATTEMPTS, sensitive=False):
+    """
+    Делает функцию фоновой задачей. Вызов func.delay(...) ставит ее в
+    очередь после коммита текущей транзакции, а саму функцию по-прежнему
+    можно вызвать напрямую. Аргументы должны сериализоваться в JSON.
+    Аргументы задачи с sensitive (письма со ссылками и токенами)
+    стираются, когда попытки кончились.
+    """
+    if func is None:
+        return partial(task, max_attempts=max_attempts, sensitive=sensitive)
+    func.task_name = f'{func.__module__}.{func.__qualname__}'
+    func.max_attempts = max_attempts
+    func.sensitive = sensitive
+    func.delay = partial(delay, func)
+    return func
+
+
+def delay(func, *args, **kwargs):
+    """
+    Ставит задачу в очередь, когда транзакция зафиксирована: воркер не
+    увидит задачу раньше данных, а при откате она не появится вовсе.
+    С TASKS_EAGER задача выполняется сразу.
+    """
+    if TASKS_EAGER:
+        func(*args, **kwargs)
+        return
+    payload = json.dumps({'args': args, 'kwargs': kwargs})
+    transaction.on_commit(lambda: Task.objects.create(
+        name=func.task_name,
+        payload=payload,
+        max_attempts=func.max_attempts,
+    ))
+
+
+def backoff(attempts):
+    """Пауза перед следующей попыткой: экспонента со случайной добавкой."""
+    delay_seconds = min(
+        TASKS_RETRY_DELAY * 2 ** (attempts - 1), TASKS_RETRY_MAX_DELAY
+    )
+    return dt.timedelta(
+        seconds=delay_seconds * random.uniform(1, 1.25)
+    )
+
+
+def claim(limit=TASKS_BATCH_SIZE):
+    """
+    Забирает до limit готовых к запуску задач. Задачи помечаются
+    одним UPDATE с проверкой состояния, поэтому два воркера не возьмут
+    одну задачу. Зависшие дольше TASKS_LOCK_TIMEOUT задачи (воркер
+    упал) берутся снова.
+    """
+    now = timezone.now()
+    ready = Q(status=Task.PENDING, run_at__lte=now) | Q(
+        status=Task.RUNNING, locked_until__lt=now
+    )
+    ids = list(Task.objects.filter(ready).order_by(
+        'run_at', 'id'
+    ).values_list('pk', flat=True)[:limit])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    Task.objects.filter(ready, pk__in=ids).update(
+        status=Task.RUNNING,
+        locked_by=token,
+        locked_until=now + dt.timedelta(seconds=TASKS_LOCK_TIMEOUT),
+    )
+    return list(Task.objects.filter(locked_by=token, status=Task.RUNNING))
+
+
+def _resolve(name):
+    func = import_string(name)
+    if getattr(func, 'task_name', None) != name:
+        raise ImportError(f'{name} не объявлена задачей')
+    return func
+
+
+def execute(queued):
+    """
+    Выполняет задачу. Успешная задача удаляется, упавшая откладывается
+    по backoff, а после max_attempts попыток остается со статусом
+    failed и текстом ошибки.
+    """
+    func = None
+    try:
+        payload = json.loads(queued.payload)
+        func = _resolve(queued.name)
+        func(*payload['args'], **payload['kwargs'])
+    except Exception:
+        queued.attempts += 1
+        queued.last_error = traceback.format_exc()
+        queued.locked_by = ''
+        queued.locked_until = None
+        if queued.attempts >= queued.max_attempts:
+            queued.status = Task.FAILED
+            if getattr(func, 'sensitive', False):
+                queued.payload = '{}'
+            logger.error(
+                'Задача %s не выполнена: %s', queued.name, queued.last_error
+            )
+        else:
+            queued.status = Task.PENDING
+            queued.run_at = timezone.now() + backoff(queued.attempts)
+            logger.warning(
+                'Задача %s упала, попытка %s', queued.name, queued.attempts
+            )
+        queued.save()
+        return False
+    Task.objects.filter(pk=queued.pk).delete()
+    return True
+
+
+def purge_failed():
+    """
+    Удаляет задачи, упавшие раньше TASKS_FAILED_RETENTION: их аргументы
+    и ошибки не должны копиться в базе бессрочно.
+    """
+    deadline = timezone.now() - dt.timedelta(seconds=TASKS_FAILED_RETENTION)
+    deleted, _ = Task.objects.filter(
+        status=Task.FAILED, run_at__lt=deadline
+    ).delete()
+    return deleted
+
+
+def run_pending(limit=TASKS_BATCH_SIZE):
+    """Выполняет одну пачку задач и возвращает число взятых."""
+    claimed = claim(limit)
+    for queued in claimed:
+        execute(queued)
+    return len(claimed)
@@ -1,6 +1,29 @@
+import datetime as dt
+import os
+import sqlite3
+import tempfile
+from concurrent.futures import Future
 from http import HTTPStatus
+from unittest import mock
 
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import mail as queued_mail
+from core import metrics, routers, tasks, write_queue
+from core.cache import get_or_compute
+from core.middleware import PRIMARY_UNTIL
+from core.models import Task
+from posts.models import Follow, Post
+
+User = get_user_model()
 
 
 class ViewTestClass(TestCase):
@@ -8,3 +31,337 @@ class ViewTestClass(TestCase):
         response = self.client.get('/nonexist-page/')
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertTemplateUsed(response, 'core/404.html')
+
+
+class GetOrComputeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.compute = mock.Mock(return_value='fresh')
+
+    def test_value_is_computed_once(self):
+        """Значение считается при промахе и дальше берется из кэша."""
+        self.assertEqual(get_or_compute('key', self.compute, 60), 'fresh')
+        self.assertEqual(get_or_compute('key', self.compute, 60), 'fresh')
+        self.compute.assert_called_once()
+
+    def test_stale_value_is_served_while_locked(self):
+        """
+        Пока другой процесс пересчитывает значение, отдается старое.
+        """
+        cache.set('key', ('stale', 1.0, 0), 60)
+        cache.add('lock:key', 1)
+        self.assertEqual(get_or_compute('key', self.compute, 60), 'stale')
+        self.compute.assert_not_called()
+
+    def test_expiring_value_is_recomputed_early(self):
+        """Значение на грани истечения пересчитывается заранее."""
+        cache.set('key', ('stale', 1.0, 0), 60)
+        self.assertEqual(get_or_compute('key', self.compute, 60), 'fresh')
+        self.assertIsNone(cache.get('lock:key'))
+
+    @mock.patch('core.cache.CACHE_LOCK_WAIT', 0.2)
+    def test_miss_waits_for_other_process(self):
+        """При промахе под чужой блокировкой ждем, затем считаем сами."""
+        cache.add('lock:key', 1)
+        self.assertEqual(get_or_compute('key', self.compute, 60), 'fresh')
+        self.compute.assert_called_once()
+
+    @mock.patch('core.cache.CACHE_LOCK_WAIT', 0.1)
+    def test_timed_out_wait_keeps_foreign_lock(self):
+        """Не дождавшись, процесс не снимает чужую блокировку."""
+        cache.add('lock:key', 'other')
+        self.assertEqual(get_or_compute('key', self.compute, 60), 'fresh')
+        self.assertEqual(cache.get('lock:key'), 'other')
+
+
+class MetricsTest(TestCase):
+    def setUp(self):
+        metrics.reset()
+        cache.clear()
+
+    def test_server_timing_header(self):
+        response = self.client.get(reverse('posts:index'))
+        timing = response['Server-Timing']
+        for part in ('db;dur=', 'tpl;dur=', 'cache;desc=', 'total;dur='):
+            with self.subTest(part=part):
+                self.assertIn(part, timing)
+
+    def test_metrics_are_grouped_by_view(self):
+        """Запросы копятся в гистограмме по имени view."""
+        self.client.get(reverse('posts:index'))
+        self.client.get(reverse('posts:index'))
+        staff = User.objects.create_user('Jan', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        text = response.content.decode()
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            text
+        )
+        self.assertIn('yatube_cache_misses_total{view="posts:index"}', text)
+        self.assertRegex(
+            text, r'yatube_db_queries_total\{view="posts:index"\} [1-9]'
+        )
+
+    def test_metrics_require_staff_or_token(self):
+        url = reverse('metrics')
+        self.assertEqual(
+            self.client.get(url).status_code, HTTPStatus.FORBIDDEN
+        )
+        with mock.patch('core.views.METRICS_TOKEN', 'secret'):
+            self.assertEqual(
+                self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong')
+                .status_code,
+                HTTPStatus.FORBIDDEN
+            )
+            self.assertEqual(
+                self.client.get(url, HTTP_AUTHORIZATION='Bearer secret')
+                .status_code,
+                HTTPStatus.OK
+            )
+
+
+class SQLitePragmasTest(TestCase):
+    def test_connection_is_configured(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+
+class WriteQueueTest(TransactionTestCase):
+    def test_batch_isolates_failed_writes(self):
+        """Ошибка одной записи не откатывает остальные записи пачки."""
+        def fail():
+            User.objects.create_user('Kelly')
+            raise ValueError
+
+        batch = [
+            (Future(), User.objects.create_user, ('Ryan',), {}),
+            (Future(), fail, (), {}),
+            (Future(), User.objects.create_user, ('Darryl',), {}),
+        ]
+        write_queue.run_batch(batch)
+        self.assertEqual(batch[0][0].result().username, 'Ryan')
+        self.assertIsInstance(batch[1][0].exception(), ValueError)
+        self.assertEqual(
+            sorted(User.objects.values_list('username', flat=True)),
+            ['Darryl', 'Ryan']
+        )
+
+    @mock.patch.object(write_queue, 'WRITE_QUEUE_ENABLED', True)
+    def test_writes_run_in_writer_thread(self):
+        user = write_queue.run(User.objects.create_user, 'Gabe')
+        self.assertIs(write_queue._writer.is_alive(), True)
+        self.assertTrue(User.objects.filter(pk=user.pk).exists())
+        with self.assertRaises(ValueError):
+            write_queue.run(int, 'not a number')
+
+
+@mock.patch.object(routers, 'REPLICA_ALIASES', ['replica1'])
+class ReplicaRouterTest(TestCase):
+    def setUp(self):
+        self.router = routers.ReplicaRouter()
+        self.addCleanup(routers.stop)
+
+    def test_reads_go_to_replica_until_write(self):
+        """После записи чтение до конца запроса идет в основную базу."""
+        routers.start(use_replica=True)
+        # TestCase держит транзакцию, а внутри нее читаем из основной базы.
+        self.assertIsNone(self.router.db_for_read(Post))
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            self.assertEqual(self.router.db_for_read(Post), 'replica1')
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+            self.assertIsNone(self.router.db_for_read(Post))
+        self.assertIs(routers.stop(), True)
+
+    def test_replica_only_for_listed_apps_and_requests(self):
+        with mock.patch.object(connection, 'in_atomic_block', False):
+            routers.start(use_replica=True)
+            self.assertIsNone(self.router.db_for_read(Session))
+            routers.start(use_replica=False)
+            self.assertIsNone(self.router.db_for_read(Post))
+        self.assertIs(
+            self.router.allow_migrate('replica1', 'posts'), False
+        )
+
+    def test_write_pins_session_to_primary(self):
+        """После комментария сессия читает из основной базы."""
+        author = User.objects.create_user('Holly')
+        post = Post.objects.create(text='Тест', author=author)
+        self.client.force_login(author)
+        self.client.get(reverse('posts:index'))
+        self.assertNotIn(PRIMARY_UNTIL, self.client.session)
+        self.client.post(
+            reverse('posts:add_comment', args=[post.pk]), {'text': 'Да'}
+        )
+        self.assertIn(PRIMARY_UNTIL, self.client.session)
+
+
+@mock.patch.object(write_queue, 'WRITE_QUEUE_ENABLED', True)
+@mock.patch.object(routers, 'REPLICA_ALIASES', ['lagging'])
+class QueuedWritePinsPrimaryTest(TransactionTestCase):
+    """
+    Реплика - отдельный файл SQLite со снимком основной базы, который
+    не получает новых записей, то есть отстает навсегда.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user('Jan')
+        self.reader = User.objects.create_user('Hunter')
+        handle, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        connection.ensure_connection()
+        with sqlite3.connect(path) as replica:
+            connection.connection.backup(replica)
+        replica.close()
+        connections.databases['lagging'] = {
+            **connection.settings_dict, 'NAME': path
+        }
+        self.addCleanup(self.drop_replica)
+
+    def drop_replica(self):
+        connections['lagging'].close()
+        del connections.databases['lagging']
+        delattr(connections._connections, 'lagging')
+
+    def test_follow_through_write_queue_pins_primary(self):
+        self.client.force_login(self.reader)
+        profile_url = reverse('posts:profile', args=[self.author.username])
+        self.client.post(
+            reverse('posts:follow_author', args=[self.author.pk]),
+            {'next': profile_url},
+        )
+        self.assertTrue(Follow.objects.filter(
+            user=self.reader, author=self.author
+        ).exists())
+        self.assertFalse(Follow.objects.using('lagging').exists())
+        self.assertIn(PRIMARY_UNTIL, self.client.session)
+        response = self.client.get(profile_url)
+        self.assertIs(response.context['following'], True)
+
+
+CALLS = []
+
+
+@tasks.task(max_attempts=2)
+def record_call(value):
+    CALLS.append(value)
+
+
+@tasks.task(max_attempts=2)
+def failing_task():
+    raise RuntimeError('сбой')
+
+
+def not_a_task():
+    CALLS.append('not a task')
+
+
+@mock.patch.object(tasks, 'TASKS_EAGER', False)
+class TaskQueueTest(TransactionTestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_task_is_queued_after_commit(self):
+        with transaction.atomic():
+            record_call.delay(1)
+            self.assertFalse(Task.objects.exists())
+        self.assertEqual(Task.objects.get().name, record_call.task_name)
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                record_call.delay(2)
+                raise ValueError
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertEqual(tasks.run_pending(), 1)
+        self.assertEqual(CALLS, [1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_eager_mode_runs_at_once(self):
+        with mock.patch.object(tasks, 'TASKS_EAGER', True):
+            record_call.delay('now')
+        self.assertEqual(CALLS, ['now'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_is_retried_with_backoff(self):
+        failing_task.delay()
+        started = timezone.now()
+        tasks.run_pending()
+        queued = Task.objects.get()
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreaterEqual(
+            queued.run_at, started + dt.timedelta(seconds=10)
+        )
+        self.assertEqual(tasks.run_pending(), 0)
+        Task.objects.update(run_at=timezone.now())
+        tasks.run_pending()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertIn('RuntimeError', queued.last_error)
+
+    def test_failed_tasks_are_purged(self):
+        failing_task.delay()
+        Task.objects.update(status=Task.FAILED, run_at=timezone.now())
+        self.assertEqual(tasks.purge_failed(), 0)
+        Task.objects.update(
+            run_at=timezone.now() - dt.timedelta(days=8)
+        )
+        self.assertEqual(tasks.purge_failed(), 1)
+        self.assertFalse(Task.objects.exists())
+
+    def test_sensitive_payload_is_cleared_on_failure(self):
+        queued_mail.send_email.delay({'subject': 'Ссылка с токеном'})
+        for _ in range(queued_mail.send_email.max_attempts):
+            Task.objects.update(run_at=timezone.now())
+            tasks.run_pending()
+        queued = Task.objects.get()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertEqual(queued.payload, '{}')
+
+    def test_admin_hides_payload(self):
+        admin_user = User.objects.create_superuser(
+            'boss', 'boss@yatube.ru', 'Password-2021'
+        )
+        record_call.delay('secret-token')
+        self.client.force_login(admin_user)
+        response = self.client.get(reverse(
+            'admin:core_task_change', args=[Task.objects.get().pk]
+        ))
+        self.assertNotContains(response, 'secret-token')
+
+    def test_task_is_claimed_once(self):
+        record_call.delay(1)
+        self.assertEqual(len(tasks.claim()), 1)
+        self.assertEqual(tasks.claim(), [])
+        Task.objects.update(locked_until=timezone.now())
+        self.assertEqual(len(tasks.claim()), 1)
+
+    def test_only_declared_tasks_run(self):
+        Task.objects.create(name='core.tests.not_a_task')
+        tasks.run_pending()
+        self.assertEqual(CALLS, [])
+        self.assertIn('не объявлена', Task.objects.get().last_error)
+
+    @mock.patch.object(
+        queued_mail, 'TASKS_EMAIL_BACKEND',
+        'django.core.mail.backends.locmem.EmailBackend'
+    )
+    def test_mail_is_sent_by_worker(self):
+        backend = queued_mail.QueuedEmailBackend()
+        message = mail.EmailMultiAlternatives(
+            'Сброс пароля', 'Ссылка', 'noreply@yatube.ru', ['user@yatube.ru']
+        )
+        message.attach_alternative('<p>Ссылка</p>', 'text/html')
+        self.assertEqual(backend.send_messages([message]), 1)
+        self.assertEqual(len(mail.outbox), 0)
+        call_command('run_tasks', once=True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['user@yatube.ru'])
+        self.assertEqual(
+            mail.outbox[0].alternatives, [('<p>Ссылка</p>', 'text/html')]
+        )
@@ -1,5 +1,13 @@
+import hmac
+
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
 from django.shortcuts import render
 
+from yatube.settings import METRICS_TOKEN
+
+from . import metrics as request_metrics
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -15,3 +23,20 @@ def csrf_failure(request, reason=''):
 
 def server_error(request):
     return render(request, 'core/500.html', status=500)
+
+
+def metrics(request):
+    """
+    Метрики процесса для Prometheus. Доступны сотрудникам и по токену
+    из METRICS_TOKEN в заголовке Authorization: Bearer <токен>.
+    """
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    token_ok = bool(METRICS_TOKEN) and hmac.compare_digest(
+        authorization, f'Bearer {METRICS_TOKEN}'
+    )
+    if not (token_ok or request.user.is_staff):
+        raise PermissionDenied
+    return HttpResponse(
+        request_metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
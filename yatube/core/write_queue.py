@@ -0,0 +1,83 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+from django.db import close_old_connections, connection, transaction
+
+from yatube.settings import (WRITE_QUEUE_BATCH_SIZE, WRITE_QUEUE_ENABLED,
+                             WRITE_QUEUE_TIMEOUT)
+
+from . import routers
+
+_queue = queue.Queue()
+_lock = threading.Lock()
+_writer = None
+
+
+def run(func, *args, **kwargs):
+    """
+    Выполняет запись через очередь процесса и возвращает результат.
+
+    Все записи процесса делает один поток: он забирает из очереди
+    все, что накопилось, и выполняет одной транзакцией, каждую запись -
+    в своей точке сохранения. Без WRITE_QUEUE_ENABLED, внутри открытой
+    транзакции и в самом потоке записи функция вызывается сразу.
+    """
+    if (not WRITE_QUEUE_ENABLED or connection.in_atomic_block
+            or threading.current_thread() is _writer):
+        return func(*args, **kwargs)
+    future = Future()
+    _queue.put((future, func, args, kwargs))
+    _ensure_writer()
+    try:
+        return future.result(WRITE_QUEUE_TIMEOUT)
+    finally:
+        routers.mark_written()
+
+
+def _ensure_writer():
+    global _writer
+    with _lock:
+        if _writer is None or not _writer.is_alive():
+            _writer = threading.Thread(
+                target=_work, name='write-queue', daemon=True
+            )
+            _writer.start()
+
+
+def _work():
+    while True:
+        batch = [_queue.get()]
+        while len(batch) < WRITE_QUEUE_BATCH_SIZE:
+            try:
+                batch.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        close_old_connections()
+        run_batch(batch)
+
+
+def run_batch(batch):
+    """
+    Выполняет пачку записей одной транзакцией. Ошибка одной записи
+    откатывает только ее точку сохранения; результаты отдаются
+    ожидающим после фиксации транзакции.
+    """
+    results = []
+    try:
+        with transaction.atomic():
+            for future, func, args, kwargs in batch:
+                try:
+                    with transaction.atomic():
+                        results.append((future, func(*args, **kwargs), None))
+                except Exception as error:
+                    results.append((future, None, error))
+    except Exception as error:
+        for future, *_ in batch:
+            future.set_exception(error)
+        return
+    for future, result, error in results:
+        if error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(error)
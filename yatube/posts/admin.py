@@ -1,15 +1,24 @@
 from django.contrib import admin
 
-from .models import Comment, Follow, Group, Post
+from .models import AuthorStats, Comment, Follow, Group, Post
+from .search import get_backend
 
 
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_display = (
+        'pk', 'text', 'pub_date', 'author', 'group', 'comments_count'
+    )
     list_editable = ('group',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        ids = get_backend().search_ids(search_term)
+        return queryset.filter(pk__in=ids), False
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('slug', 'title', 'description')
@@ -18,7 +27,19 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = (
+        'user', 'posts_count', 'followers_count', 'following_count'
+    )
+    list_select_related = ('user',)
+    search_fields = ('user__username',)
+    readonly_fields = (
+        'user', 'posts_count', 'followers_count', 'following_count'
+    )
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment)
 admin.site.register(Follow)
+admin.site.register(AuthorStats, AuthorStatsAdmin)
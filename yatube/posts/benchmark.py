@@ -0,0 +1,176 @@
+import math
+import random
+import time
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import transfer
+from .models import Comment, Follow, Group, Post, User
+
+DATASET = {
+    'users': 50,
+    'groups': 5,
+    'posts': 1000,
+    'comments': 2000,
+    'follows': 200,
+}
+PERCENTILES = (50, 95, 99)
+USER_PREFIX = 'bench'
+
+
+def seed(users, groups, posts, comments, follows, random_seed=0):
+    """
+    Наполняет базу синтетическими данными через bulk_create и затем
+    пересчитывает счетчики и ленты, как после импорта.
+    """
+    rnd = random.Random(random_seed)
+    User.objects.bulk_create(
+        User(username=f'{USER_PREFIX}{i}') for i in range(users)
+    )
+    user_ids = list(User.objects.filter(
+        username__startswith=USER_PREFIX
+    ).values_list('id', flat=True))
+    Group.objects.bulk_create(
+        Group(
+            title=f'Группа {i}', slug=f'{USER_PREFIX}-{i}', description='-'
+        )
+        for i in range(groups)
+    )
+    group_ids = list(Group.objects.values_list('id', flat=True)) + [None]
+    Post.objects.bulk_create(
+        Post(
+            text=f'Пост {i} ' * rnd.randint(1, 20),
+            author_id=rnd.choice(user_ids),
+            group_id=rnd.choice(group_ids),
+        )
+        for i in range(posts)
+    )
+    post_ids = list(Post.objects.values_list('id', flat=True))
+    Comment.objects.bulk_create(
+        Comment(
+            text=f'Комментарий {i}',
+            post_id=rnd.choice(post_ids),
+            author_id=rnd.choice(user_ids),
+        )
+        for i in range(comments if post_ids else 0)
+    )
+    pairs = set()
+    limit = min(follows, len(user_ids) * (len(user_ids) - 1))
+    while len(pairs) < limit:
+        user_id, author_id = rnd.sample(user_ids, 2)
+        pairs.add((user_id, author_id))
+    Follow.objects.bulk_create(
+        Follow(user_id=user, author_id=author) for user, author in pairs
+    )
+    transfer.finish_import('post')
+    transfer.finish_import('comment')
+
+
+def scenarios():
+    """
+    Имена сценариев и функции, которые строят запрос: метод, адрес и
+    данные формы. Для страниц с параметрами берутся самые "тяжелые"
+    объекты: автор и группа с наибольшим числом постов и т.п. Если
+    таких объектов в базе нет, сценарии с ними пропускаются.
+    """
+    post = Post.objects.order_by('-comments_count', 'pk').first()
+    group = Group.objects.annotate(total=Count('posts')).order_by(
+        '-total', 'pk'
+    ).first()
+    author = User.objects.order_by('-stats__posts_count', 'pk').first()
+    result = {
+        'index': ('get', reverse('posts:index'), None),
+        'follow_index': ('get', reverse('posts:follow_index'), None),
+        'api_posts': ('get', reverse('api:posts'), None),
+        'post_create': (
+            'post', reverse('posts:post_create'), {'text': 'Новый пост'}
+        ),
+    }
+    if group is not None:
+        result['group_list'] = (
+            'get', reverse('posts:group_list', args=[group.slug]), None
+        )
+    if author is not None:
+        result['profile'] = (
+            'get', reverse('posts:profile', args=[author.username]), None
+        )
+    if post is not None:
+        result['post_detail'] = (
+            'get', reverse('posts:post_detail', args=[post.pk]), None
+        )
+        result['add_comment'] = (
+            'post',
+            reverse('posts:add_comment', args=[post.pk]),
+            {'text': 'Новый комментарий'},
+        )
+    return result
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def measure(client, method, url, data, requests):
+    latencies, queries, sizes = [], [], []
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, method)(url, data)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        sizes.append(len(response.content))
+    result = {
+        f'p{percent}': round(percentile(latencies, percent), 3)
+        for percent in PERCENTILES
+    }
+    result['queries'] = max(queries)
+    result['bytes'] = max(sizes)
+    return result
+
+
+def run(requests=50, warmup=1, only=None):
+    """
+    Прогоняет сценарии через тестовый клиент от имени пользователя
+    с наибольшим числом подписок. Перед замером каждый адрес
+    запрашивается warmup раз, чтобы прогреть кэш лент.
+    """
+    cache.clear()
+    reader = User.objects.order_by('-stats__following_count', 'pk').first()
+    client = Client()
+    client.force_login(reader)
+    results = {}
+    for name, (method, url, data) in scenarios().items():
+        if only and name not in only:
+            continue
+        for _ in range(warmup):
+            getattr(client, method)(url, data)
+        results[name] = measure(client, method, url, data, requests)
+    return results
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Сравнивает замеры с базовыми и возвращает список регрессий: время
+    и размер ответа могут вырасти не больше чем на tolerance, число
+    запросов к базе расти не должно.
+    """
+    regressions = []
+    for name, expected in baseline.items():
+        actual = results.get(name)
+        if actual is None:
+            continue
+        for metric, limit in expected.items():
+            allowed = limit if metric == 'queries' else limit * (1 + tolerance)
+            if actual.get(metric, 0) > allowed:
+                regressions.append(
+                    f'{name}.{metric}: {actual[metric]} > {limit}'
+                )
+    return regressions
@@ -0,0 +1,75 @@
+import hashlib
+
+from django.utils.translation import get_language
+from django.views.decorators.http import condition
+
+from core import page_cache
+
+from . import feed_cache
+from .models import User
+
+# Валидаторы условных запросов (If-None-Match, If-Modified-Since).
+# Они считаются до отрисовки по версиям из кэша: версия лент меняется
+# при любом изменении постов, комментариев и групп, а суррогатные
+# ключи страниц - еще и при подписках. max(pub_date) для этого не
+# годится: он не видит правок и удалений.
+
+
+def _etag(request, *keys):
+    user = request.user.pk if request.user.is_authenticated else ''
+    versions = page_cache.versions(keys)
+    raw = ':'.join(str(part) for part in (
+        feed_cache.version(),
+        *(versions[name] for name in sorted(versions)),
+        user,
+        get_language(),
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def last_modified(request, *args, **kwargs):
+    return page_cache.last_modified()
+
+
+def index_etag(request):
+    return _etag(request, 'index')
+
+
+def group_etag(request, slug):
+    # Группу и ее посты покрывает версия лент, id группы не нужен.
+    return _etag(request)
+
+
+def profile_etag(request, username):
+    writer_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    if writer_id is None:
+        return None
+    return _etag(request, f'author-{writer_id}')
+
+
+def follow_list_etag(request, username):
+    # Кнопки подписки в списке зависят и от подписок самого зрителя.
+    writer_id = User.objects.filter(username=username).values_list(
+        'pk', flat=True
+    ).first()
+    if writer_id is None:
+        return None
+    keys = [f'author-{writer_id}']
+    if request.user.is_authenticated:
+        keys.append(f'author-{request.user.pk}')
+    return _etag(request, *keys)
+
+
+def post_etag(request, post_id):
+    return _etag(request, f'post-{post_id}', f'comments-{post_id}')
+
+
+def follow_etag(request):
+    return _etag(request, f'author-{request.user.pk}')
+
+
+def conditional(etag_func):
+    """Отвечает 304, не вызывая view, если страница не менялась."""
+    return condition(etag_func=etag_func, last_modified_func=last_modified)
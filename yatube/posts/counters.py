@@ -0,0 +1,94 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import AuthorStats, Comment, Follow, Post, User
+
+USER_COUNTERS = {
+    'posts_count': (Post, 'author'),
+    'followers_count': (Follow, 'author'),
+    'following_count': (Follow, 'user'),
+}
+
+
+def _count(model, field):
+    """Подзапрос COUNT(*) связанных строк без JOIN всех таблиц сразу."""
+    return Coalesce(Subquery(
+        model.objects.filter(
+            **{field: OuterRef('pk')}
+        ).order_by().values(field).annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def bump_user(user_id, **deltas):
+    """
+    Атомарно меняет счетчики пользователя через F()-выражения. Строки
+    счетчиков может не быть посреди каскадного удаления пользователя:
+    тогда сверка откладывается до коммита, когда связанные строки уже
+    удалены вместе с ним, и для удаленного пользователя не выполняется.
+    """
+    updated = AuthorStats.objects.filter(user_id=user_id).update(**{
+        field: Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+    })
+    if not updated:
+        transaction.on_commit(
+            lambda: reconcile_users(User.objects.filter(pk=user_id))
+        )
+
+
+def bump_comments(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        comments_count=Greatest(F('comments_count') + delta, 0)
+    )
+
+
+def reconcile_users(users=None, batch_size=1000):
+    """
+    Сверяет счетчики пользователей с фактическими данными и
+    исправляет расхождения. Возвращает число исправленных строк.
+    """
+    if users is None:
+        users = User.objects.all()
+    rows = users.order_by('pk').annotate(**{
+        field: _count(model, lookup)
+        for field, (model, lookup) in USER_COUNTERS.items()
+    }).values('pk', *USER_COUNTERS)
+    fixed = 0
+    batch = []
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) == batch_size:
+            fixed += _reconcile_batch(batch)
+            batch = []
+    return fixed + _reconcile_batch(batch)
+
+
+def _reconcile_batch(rows):
+    stored = AuthorStats.objects.in_bulk([row['pk'] for row in rows])
+    created, changed = [], []
+    for row in rows:
+        stats = stored.get(row['pk'])
+        if stats is None:
+            created.append(AuthorStats(
+                user_id=row['pk'],
+                **{field: row[field] for field in USER_COUNTERS}
+            ))
+        elif any(getattr(stats, field) != row[field]
+                 for field in USER_COUNTERS):
+            for field in USER_COUNTERS:
+                setattr(stats, field, row[field])
+            changed.append(stats)
+    AuthorStats.objects.bulk_create(created, ignore_conflicts=True)
+    AuthorStats.objects.bulk_update(changed, list(USER_COUNTERS))
+    return len(created) + len(changed)
+
+
+def reconcile_posts():
+    """Сверяет счетчики комментариев постов, возвращает число исправлений."""
+    drifted = Post.objects.annotate(
+        actual=_count(Comment, 'post')
+    ).exclude(comments_count=F('actual')).values_list('pk', flat=True)
+    return Post.objects.filter(pk__in=list(drifted)).update(
+        comments_count=_count(Comment, 'post')
+    )
@@ -0,0 +1,66 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.utils.translation import get_language
+
+from core.cache import get_or_compute
+from yatube.settings import FEED_CACHE_TIMEOUT
+
+VERSION_KEY = 'feed:version'
+
+
+def version():
+    """
+    Текущая версия лент. Начальное значение - время в миллисекундах,
+    чтобы после вытеснения ключа версия не вернулась к старой.
+    """
+    current = cache.get(VERSION_KEY)
+    if current is None:
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        current = cache.get(VERSION_KEY)
+    return current
+
+
+def bump():
+    """Делает устаревшими все закэшированные страницы лент."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        version()
+
+
+def surrogate_keys(posts):
+    """Ключи страницы для сброса кэша: ее посты, их авторы и группы."""
+    for post in posts:
+        yield f'post-{post.pk}'
+        yield f'author-{post.author_id}'
+        if post.group_id:
+            yield f'group-{post.group_id}'
+
+
+def key(view_name, cursor, *parts):
+    raw = ':'.join(str(part) for part in (
+        view_name, *parts, cursor or '', get_language()
+    ))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    return f'feed:page:{version()}:{digest}'
+
+
+def get_page(paginator, cursor, view_name, *parts):
+    """
+    Страница ленты из кэша. В кэше хранятся только строки и курсоры:
+    сама страница ссылается на queryset, который нельзя сериализовать.
+    При промахе страницу строит один процесс, а не каждый воркер.
+    """
+    def build():
+        page = paginator.get_page(cursor)
+        return list(page), page.previous_cursor, page.next_cursor
+
+    page_key = key(view_name, cursor, *parts)
+    page = paginator.make_page(
+        *get_or_compute(page_key, build, FEED_CACHE_TIMEOUT)
+    )
+    page.cache_key = page_key
+    page.cache_timeout = FEED_CACHE_TIMEOUT
+    return page
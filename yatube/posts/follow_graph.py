@@ -0,0 +1,90 @@
+import time
+from bisect import bisect_left
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core import metrics
+from yatube.settings import FOLLOW_GRAPH_TIMEOUT
+
+from .models import Follow
+
+GENERATION_KEY = 'follow:generation'
+
+
+def _key(user_id):
+    return f'follow:following:{user_id}'
+
+
+def _version_key(user_id):
+    return f'follow:version:{user_id}'
+
+
+def _current(cached, name):
+    # Как у версии лент: после вытеснения ключа значение не вернется
+    # к старому.
+    value = cached.get(name)
+    if value is None:
+        cache.add(name, int(time.time() * 1000), None)
+        value = cache.get(name)
+    return value
+
+
+def _bump(name):
+    try:
+        cache.incr(name)
+    except ValueError:
+        cache.add(name, int(time.time() * 1000), None)
+
+
+def following_ids(user_id):
+    """
+    Отсортированный кортеж id авторов, на которых подписан
+    пользователь. Хранится в кэше вместе с поколением графа и версией
+    подписок пользователя и пересобирается одним запросом по индексу
+    (user, author).
+    """
+    key, version_key = _key(user_id), _version_key(user_id)
+    cached = cache.get_many([GENERATION_KEY, version_key, key])
+    stamp = (_current(cached, GENERATION_KEY), _current(cached, version_key))
+    entry = cached.get(key)
+    hit = entry is not None and entry[0] == stamp
+    metrics.cache_hit(hit)
+    if hit:
+        return entry[1]
+    ids = tuple(sorted(Follow.objects.filter(user_id=user_id).values_list(
+        'author_id', flat=True
+    )))
+    cache.set(key, (stamp, ids), FOLLOW_GRAPH_TIMEOUT)
+    return ids
+
+
+def _contains(ids, value):
+    index = bisect_left(ids, value)
+    return index < len(ids) and ids[index] == value
+
+
+def is_following(user_id, author_id):
+    return _contains(following_ids(user_id), author_id)
+
+
+def following_among(user_id, author_ids):
+    """На кого из author_ids подписан пользователь - без запроса на автора."""
+    ids = following_ids(user_id)
+    return {author_id for author_id in author_ids if _contains(ids, author_id)}
+
+
+def invalidate(user_id):
+    """
+    Меняет версию подписок сразу и еще раз после коммита: набор,
+    который параллельный запрос прочитал до фиксации изменения и успел
+    положить в кэш, не совпадет с новой версией.
+    """
+    version_key = _version_key(user_id)
+    _bump(version_key)
+    transaction.on_commit(lambda: _bump(version_key))
+
+
+def invalidate_all():
+    """Сбрасывает все наборы, например после массовой загрузки подписок."""
+    _bump(GENERATION_KEY)
@@ -0,0 +1,80 @@
+from django.db import connections, router, transaction
+
+from core import page_cache
+
+from . import counters, follow_graph, timeline
+from .models import Follow, User
+
+
+def _purge(user_id, author_id):
+    """
+    Сбрасывает страницы сразу и еще раз после коммита: иначе
+    параллельный запрос положил бы в кэш страницу до фиксации
+    под новой версией ключей.
+    """
+    keys = (f'author-{author_id}', f'author-{user_id}')
+    page_cache.purge(*keys)
+    transaction.on_commit(lambda: page_cache.purge(*keys))
+
+
+def followed(user_id, author_id):
+    """Все, что зависит от новой подписки: счетчики, лента и кэши."""
+    counters.bump_user(author_id, followers_count=1)
+    counters.bump_user(user_id, following_count=1)
+    timeline.catch_up.delay(user_id, author_id)
+    _purge(user_id, author_id)
+    follow_graph.invalidate(user_id)
+
+
+def unfollowed(user_id, author_id):
+    counters.bump_user(author_id, followers_count=-1)
+    counters.bump_user(user_id, following_count=-1)
+    timeline.trim(user_id, author_id)
+    _purge(user_id, author_id)
+    follow_graph.invalidate(user_id)
+
+
+def _sql(template):
+    connection = connections[router.db_for_write(Follow)]
+    quote = connection.ops.quote_name
+    return connection, template.format(
+        follow=quote(Follow._meta.db_table),
+        user=quote(User._meta.db_table),
+        user_id=quote(Follow._meta.get_field('user').column),
+        author_id=quote(Follow._meta.get_field('author').column),
+        id=quote(User._meta.pk.column),
+    )
+
+
+def follow(user_id, author_id):
+    """
+    Подписка одним INSERT ... ON CONFLICT DO NOTHING без предварительного
+    чтения. Возвращает True, если подписка появилась; повторный клик,
+    подписка на себя и несуществующий автор дают False без исключений.
+    """
+    connection, sql = _sql(
+        'INSERT INTO {follow} ({user_id}, {author_id}) '
+        'SELECT %s, {id} FROM {user} WHERE {id} = %s AND {id} <> %s '
+        'ON CONFLICT DO NOTHING'
+    )
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user_id, author_id, user_id])
+            created = cursor.rowcount == 1
+        if created:
+            followed(user_id, author_id)
+    return created
+
+
+def unfollow(user_id, author_id):
+    """Отписка одним DELETE; True, если подписка была."""
+    connection, sql = _sql(
+        'DELETE FROM {follow} WHERE {user_id} = %s AND {author_id} = %s'
+    )
+    with transaction.atomic(using=connection.alias):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user_id, author_id])
+            deleted = cursor.rowcount == 1
+        if deleted:
+            unfollowed(user_id, author_id)
+    return deleted
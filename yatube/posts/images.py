@@ -0,0 +1,123 @@
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, features
+
+from core import page_cache
+from core.tasks import task
+from yatube.settings import POST_IMAGE_FORMATS, POST_IMAGE_VARIANTS
+
+from . import feed_cache
+from .models import ImageVariant, Post
+
+EXTENSIONS = {'jpeg': 'jpg', 'webp': 'webp'}
+
+logger = logging.getLogger(__name__)
+
+
+def supported_formats():
+    """Форматы из настроек, которые умеет кодировать установленный Pillow."""
+    return [
+        image_format for image_format in POST_IMAGE_FORMATS
+        if image_format == 'jpeg' or features.check(image_format)
+    ]
+
+
+def fit(image, width, height, upscale=True):
+    """Вписывает картинку в рамку с сохранением пропорций."""
+    ratio = min(width / image.width, height / image.height)
+    if ratio > 1 and not upscale:
+        return image
+    size = (
+        max(round(image.width * ratio), 1),
+        max(round(image.height * ratio), 1),
+    )
+    return image.resize(size, Image.LANCZOS)
+
+
+def encode(image, image_format, quality):
+    buffer = BytesIO()
+    image.save(buffer, image_format.upper(), quality=quality, optimize=True)
+    return ContentFile(buffer.getvalue())
+
+
+@task
+def process(post_id):
+    """
+    Строит все варианты картинки поста (каждую ширину в каждом формате)
+    и сохраняет размеры оригинала. Старые варианты удаляются. Запись
+    идет через update и bulk_create без сигналов, поэтому кэши лент и
+    страниц с постом сбрасываются здесь же.
+    """
+    post = Post.objects.filter(pk=post_id).only('id', 'image').first()
+    if post is None:
+        return
+    _process(post)
+    feed_cache.bump()
+    page_cache.purge(f'post-{post_id}')
+
+
+def _process(post):
+    post_id = post.pk
+    for variant in ImageVariant.objects.filter(post_id=post_id):
+        variant.file.delete(save=False)
+        variant.delete()
+    if not post.image:
+        Post.objects.filter(pk=post_id).update(
+            image_width=None, image_height=None
+        )
+        return
+    try:
+        with post.image.open('rb') as source:
+            original = Image.open(source)
+            original.load()
+    except OSError:
+        logger.warning('Не удалось открыть картинку поста %s', post_id)
+        return
+    Post.objects.filter(pk=post_id).update(
+        image_width=original.width, image_height=original.height
+    )
+    image = original.convert('RGB')
+    base_name = os.path.splitext(os.path.basename(post.image.name))[0]
+    variants = []
+    for name, spec in POST_IMAGE_VARIANTS.items():
+        box_width, box_height = spec['size']
+        done = set()
+        for width, quality in sorted(spec['widths'].items()):
+            resized = fit(
+                image,
+                width,
+                round(width * box_height / box_width),
+                upscale=spec.get('upscale', True),
+            )
+            if resized.size in done:
+                continue
+            done.add(resized.size)
+            for image_format in supported_formats():
+                variant = ImageVariant(
+                    post_id=post_id,
+                    name=name,
+                    format=image_format,
+                    width=resized.width,
+                    height=resized.height,
+                )
+                variant.file.save(
+                    '{}-{}-{}.{}'.format(
+                        base_name, name, resized.width,
+                        EXTENSIONS[image_format]
+                    ),
+                    encode(resized, image_format, quality),
+                    save=False,
+                )
+                variants.append(variant)
+    ImageVariant.objects.bulk_create(variants)
+
+
+def schedule(post):
+    """
+    Ставит обработку картинки в очередь задач после коммита транзакции,
+    чтобы запрос не ждал Pillow.
+    """
+    process.delay(post.pk)
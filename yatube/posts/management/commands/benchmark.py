@@ -0,0 +1,78 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержки, число запросов и размер ответов страниц '
+        'posts на синтетических данных во временной базе'
+    )
+
+    def add_arguments(self, parser):
+        for name, default in benchmark.DATASET.items():
+            parser.add_argument(f'--{name}', type=int, default=default)
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument(
+            '--only', nargs='+', help='Замерить только эти сценарии'
+        )
+        parser.add_argument('--save', help='Сохранить замеры в JSON')
+        parser.add_argument('--baseline', help='Сравнить с замерами из JSON')
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.25,
+            help='Допустимый рост времени и размера ответа',
+        )
+
+    def handle(self, *args, **options):
+        dataset = {name: options[name] for name in benchmark.DATASET}
+        if dataset['users'] < 1:
+            raise CommandError(
+                'Замер идет от имени пользователя: нужен --users 1 или больше'
+            )
+        setup_test_environment(debug=False)
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        try:
+            benchmark.seed(**dataset)
+            results = benchmark.run(options['requests'], only=options['only'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        columns = ('p50', 'p95', 'p99', 'queries', 'bytes')
+        self.stdout.write(
+            f'{"":<14}' + ''.join(f'{column:>10}' for column in columns)
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f'{name:<14}'
+                + ''.join(f'{result[column]:>10}' for column in columns)
+            )
+        if options['save']:
+            with open(options['save'], 'w') as stream:
+                json.dump(
+                    {'dataset': dataset, 'results': results}, stream, indent=2
+                )
+        if options['baseline']:
+            with open(options['baseline']) as stream:
+                baseline = json.load(stream)
+            if baseline.get('dataset') != dataset:
+                self.stderr.write(
+                    'Размер данных отличается от базового замера'
+                )
+            regressions = benchmark.compare(
+                results, baseline['results'], options['tolerance']
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии производительности:\n'
+                    + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет'))
@@ -0,0 +1,66 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+from yatube.settings import TRANSFER_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает группы, посты, комментарии или подписки в NDJSON '
+        'или CSV. Прерванная выгрузка дописывается с отметки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=list(transfer.MODELS))
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=transfer.FORMATS)
+        parser.add_argument(
+            '--chunk-size', type=int, default=TRANSFER_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл отметки, по умолчанию <path>.checkpoint',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or transfer.guess_format(path)
+        chunk_size = options['chunk_size']
+        checkpoint = options['checkpoint'] or path + '.checkpoint'
+        last_pk, offset = transfer.load_position(checkpoint)
+        if last_pk and os.path.exists(path):
+            # Строки, записанные после отметки, выгрузятся снова.
+            os.truncate(path, offset)
+        else:
+            last_pk = 0
+        progress = transfer.Throughput()
+        _, fields = transfer.MODELS[options['model']]
+        mode = 'a' if last_pk else 'w'
+        with open(path, mode, newline='', encoding='utf-8') as stream:
+            writer = transfer.RowWriter(
+                stream, fmt, fields, header=not last_pk
+            )
+            rows = transfer.export_rows(
+                options['model'], last_pk, chunk_size
+            )
+            pending = 0
+            for row in rows:
+                writer.write(row)
+                last_pk = row[0]
+                pending += 1
+                if pending == chunk_size:
+                    stream.flush()
+                    transfer.save_checkpoint(
+                        checkpoint, last_pk, stream.tell()
+                    )
+                    progress.add(pending)
+                    pending = 0
+                    if options['verbosity'] > 1:
+                        self.stdout.write(str(progress))
+            progress.add(pending)
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(f'Выгружено: {progress}'))
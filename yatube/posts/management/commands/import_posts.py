@@ -0,0 +1,58 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+from yatube.settings import TRANSFER_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает группы, посты, комментарии или подписки из NDJSON '
+        'или CSV. Прерванная загрузка продолжается с отметки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=list(transfer.MODELS))
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=transfer.FORMATS)
+        parser.add_argument(
+            '--batch-size', type=int, default=TRANSFER_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Файл отметки, по умолчанию <path>.checkpoint',
+        )
+        parser.add_argument(
+            '--no-rebuild',
+            action='store_true',
+            help='Не пересчитывать счетчики и ленты после загрузки',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or transfer.guess_format(path)
+        checkpoint = options['checkpoint'] or path + '.checkpoint'
+        skip = transfer.load_checkpoint(checkpoint)
+        progress = transfer.Throughput(skip)
+
+        def on_batch(done, rows):
+            transfer.save_checkpoint(checkpoint, done)
+            progress.add(rows)
+            if options['verbosity'] > 1:
+                self.stdout.write(str(progress))
+
+        with open(path, newline='', encoding='utf-8') as stream:
+            transfer.import_rows(
+                options['model'],
+                transfer.read_rows(stream, fmt),
+                options['batch_size'],
+                skip=skip,
+                on_batch=on_batch,
+            )
+        if not options['no_rebuild']:
+            transfer.finish_import(options['model'])
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        if options['verbosity']:
+            self.stdout.write(self.style.SUCCESS(f'Загружено: {progress}'))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts import images
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Готовит варианты картинок для постов, у которых их еще нет'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересоздать варианты для всех постов с картинками',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(image_variants__isnull=True)
+        processed = 0
+        for post_id in posts.values_list('pk', flat=True).iterator():
+            images.process(post_id)
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {processed}'
+        ))
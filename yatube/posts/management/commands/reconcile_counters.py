@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счетчики постов и пользователей'
+
+    def handle(self, *args, **options):
+        users = counters.reconcile_users()
+        posts = counters.reconcile_posts()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счетчиков: пользователей {users}, постов {posts}'
+        ))
@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-17 19:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_image_variants'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='imagevariant',
+            name='image_variant_unique',
+        ),
+        migrations.AddConstraint(
+            model_name='imagevariant',
+            constraint=models.UniqueConstraint(fields=('post', 'name', 'format', 'width'), name='image_variant_width_unique'),
+        ),
+    ]
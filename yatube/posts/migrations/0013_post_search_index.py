@@ -0,0 +1,25 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    from posts import search
+
+    search.install(schema_editor.connection)
+    search.rebuild(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    from posts import search
+
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_image_variant_widths'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
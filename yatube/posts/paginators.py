@@ -0,0 +1,133 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+FORWARD = 'n'
+BACKWARD = 'p'
+
+
+class CursorPaginator(Paginator):
+    """
+    Постраничная навигация по ключу сортировки (keyset) вместо OFFSET.
+
+    Страница запрашивается непрозрачным курсором, в котором закодированы
+    направление и значения ключа крайней записи, поэтому запрос к любой
+    странице - это поиск по индексу и LIMIT без COUNT(*). Номера страниц
+    нет: его пришлось бы либо считать, либо брать у клиента.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        super().__init__(object_list.order_by(*ordering), per_page)
+        self.ordering = ordering
+
+    def get_page(self, cursor=None):
+        """
+        Возвращает страницу по курсору; для пустого или испорченного
+        курсора возвращается первая страница.
+        """
+        direction, values = self.decode_cursor(cursor)
+        queryset = self.object_list
+        if values is not None:
+            queryset = queryset.filter(self._seek(values, direction))
+        if direction == BACKWARD:
+            queryset = queryset.reverse()
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == BACKWARD:
+            rows.reverse()
+            has_previous = has_more
+            # Курсор назад ничего не говорит о том, что за страницей:
+            # строка, с которой он снят, могла пропасть, а сам курсор -
+            # быть подделан. Следующая запись проверяется отдельно.
+            has_next = bool(rows) and self._exists_after(rows[-1])
+        else:
+            has_previous, has_next = values is not None, has_more
+        previous_cursor = next_cursor = None
+        if rows and has_previous:
+            previous_cursor = self.encode_cursor(BACKWARD, rows[0])
+        if rows and has_next:
+            next_cursor = self.encode_cursor(FORWARD, rows[-1])
+        return self.make_page(rows, previous_cursor, next_cursor)
+
+    def make_page(self, rows, previous_cursor, next_cursor):
+        """
+        Собирает страницу из уже выбранных строк, например из кэша.
+        Соседние страницы определяются по курсорам, а не по номеру
+        и общему числу записей.
+        """
+        page = Page(rows, None, self)
+        page.previous_cursor = previous_cursor
+        page.next_cursor = next_cursor
+        page.has_previous = lambda: previous_cursor is not None
+        page.has_next = lambda: next_cursor is not None
+        return page
+
+    def encode_cursor(self, direction, row):
+        values = [self._value(row, name) for name in self._fields]
+        raw = json.dumps([direction, values], default=str)
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        if not cursor:
+            return FORWARD, None
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(raw.decode())
+            if (direction not in (FORWARD, BACKWARD)
+                    or len(values) != len(self._fields)):
+                raise ValueError
+            values = [
+                self._model_field(name).to_python(value)
+                for name, value in zip(self._fields, values)
+            ]
+            return direction, values
+        except (binascii.Error, TypeError, ValueError, ValidationError):
+            return FORWARD, None
+
+    def _exists_after(self, row):
+        values = [self._value(row, name) for name in self._fields]
+        return self.object_list.filter(
+            self._seek(values, FORWARD)
+        )[:1].exists()
+
+    @cached_property
+    def _fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def _model_field(self, name):
+        annotations = self.object_list.query.annotations
+        if name in annotations:
+            return annotations[name].output_field
+        opts = self.object_list.model._meta
+        return opts.pk if name == 'pk' else opts.get_field(name)
+
+    @staticmethod
+    def _value(row, name):
+        if isinstance(row, dict):
+            return row[name]
+        return getattr(row, name)
+
+    def _seek(self, values, direction):
+        """
+        Условие "строго после ключа" в порядке сортировки: для
+        (a, b) по убыванию это a <= x AND (a < x OR (a = x AND b < y)).
+        Нестрогая граница по первому полю дает базе диапазон индекса.
+        """
+        condition = Q()
+        equal = {}
+        bound = None
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip('-')
+            descending = name.startswith('-') == (direction == FORWARD)
+            lookup = '__lt' if descending else '__gt'
+            if bound is None:
+                bound = Q(**{field + lookup[:-1] + 'te': value})
+            condition |= Q(**equal, **{field + lookup: value})
+            equal[field] = value
+        return bound & condition
@@ -0,0 +1,204 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from yatube.settings import (SEARCH_BACKEND, SEARCH_BACKENDS,
+                             SEARCH_MAX_RESULTS, SEARCH_MAX_TERMS)
+
+from .models import Group, Post, User
+
+WORD = re.compile(r'\w+')
+
+INDEX_TABLE = 'posts_post_fts'
+
+
+def terms(query):
+    """Слова запроса без операторов и спецсимволов."""
+    return WORD.findall(query.lower())[:SEARCH_MAX_TERMS]
+
+
+class SearchResults:
+    """
+    Найденные посты в порядке релевантности. Поиск сразу отдает
+    только id, сами посты выбираются срезом - по странице за раз,
+    поэтому объект можно передавать в обычный Paginator.
+    """
+
+    def __init__(self, ids, queryset):
+        self.ids = ids
+        self.queryset = queryset
+
+    def count(self):
+        return len(self.ids)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, key):
+        ids = self.ids[key]
+        if not isinstance(key, slice):
+            return self.queryset.get(pk=ids)
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+class BaseSearchBackend:
+    def search_ids(self, query, limit=SEARCH_MAX_RESULTS):
+        """Id постов, подходящих под запрос, от лучших к худшим."""
+        raise NotImplementedError
+
+    def search(self, query, queryset=None):
+        if queryset is None:
+            queryset = Post.objects.for_feed()
+        return SearchResults(self.search_ids(query), queryset)
+
+
+class BasicSearchBackend(BaseSearchBackend):
+    """
+    Поиск через LIKE для баз без полнотекстового индекса: все слова
+    должны встретиться в тексте, названии группы или имени автора.
+    """
+
+    fields = (
+        'text',
+        'group__title',
+        'author__username',
+        'author__first_name',
+        'author__last_name',
+    )
+
+    def search_ids(self, query, limit=SEARCH_MAX_RESULTS):
+        words = terms(query)
+        if not words:
+            return []
+        condition = Q()
+        for word in words:
+            matches = Q()
+            for field in self.fields:
+                matches |= Q(**{field + '__icontains': word})
+            condition &= matches
+        return list(
+            Post.objects.filter(condition).order_by(
+                '-pub_date', '-id'
+            ).values_list('id', flat=True)[:limit]
+        )
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """
+    Поиск по индексу FTS5 с ранжированием bm25. Индекс хранит текст
+    поста, название группы и имя автора и обновляется триггерами,
+    так что в нем оказываются и посты, созданные через bulk_create
+    или update().
+    """
+
+    def match(self, query):
+        """Каждое слово - отдельная фраза с поиском по префиксу."""
+        return ' '.join('"{}"*'.format(word) for word in terms(query))
+
+    def search_ids(self, query, limit=SEARCH_MAX_RESULTS):
+        expression = self.match(query)
+        if not expression:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT rowid FROM {0} WHERE {0} MATCH %s '
+                'ORDER BY rank LIMIT %s'.format(INDEX_TABLE),
+                [expression, limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+def get_backend():
+    name = SEARCH_BACKEND
+    if not name:
+        name = connection.vendor
+        if name not in SEARCH_BACKENDS:
+            name = 'basic'
+    path = SEARCH_BACKENDS.get(name, name)
+    return import_string(path)()
+
+
+def _index_row(post):
+    """SQL для строки индекса по строке posts_post с псевдонимом post."""
+    return (
+        "{post}.id, {post}.text, "
+        "COALESCE((SELECT title FROM {group} "
+        "WHERE id = {post}.group_id), ''), "
+        "(SELECT username || ' ' || first_name || ' ' || last_name "
+        "FROM {user} WHERE id = {post}.author_id)"
+    ).format(
+        post=post, group=Group._meta.db_table, user=User._meta.db_table
+    )
+
+
+def install(connection):
+    """
+    Создает таблицу индекса и триггеры, если их еще нет. Пересборка
+    таблицы при миграциях SQLite удаляет ее триггеры, поэтому функция
+    вызывается и после каждого migrate.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    tables = {
+        'post': Post._meta.db_table,
+        'group': Group._meta.db_table,
+        'user': User._meta.db_table,
+        'index': INDEX_TABLE,
+    }
+    insert = (
+        'INSERT INTO {index}(rowid, text, group_title, author_name) '
+        'VALUES ({row});'
+    ).format(row=_index_row('new'), **tables)
+    delete = 'DELETE FROM {index} WHERE rowid = old.id;'.format(**tables)
+    statements = (
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+        "text, group_title, author_name, tokenize = 'unicode61')",
+        'CREATE TRIGGER IF NOT EXISTS {index}_insert '
+        'AFTER INSERT ON {post} BEGIN ' + insert + ' END',
+        'CREATE TRIGGER IF NOT EXISTS {index}_delete '
+        'AFTER DELETE ON {post} BEGIN ' + delete + ' END',
+        'CREATE TRIGGER IF NOT EXISTS {index}_update '
+        'AFTER UPDATE OF text, group_id, author_id ON {post} BEGIN '
+        + delete + ' ' + insert + ' END',
+        'CREATE TRIGGER IF NOT EXISTS {index}_group '
+        'AFTER UPDATE OF title ON {group} BEGIN '
+        'UPDATE {index} SET group_title = new.title WHERE rowid IN '
+        '(SELECT id FROM {post} WHERE group_id = new.id); END',
+        'CREATE TRIGGER IF NOT EXISTS {index}_author '
+        'AFTER UPDATE OF username, first_name, last_name ON {user} BEGIN '
+        "UPDATE {index} SET author_name = "
+        "new.username || ' ' || new.first_name || ' ' || new.last_name "
+        'WHERE rowid IN (SELECT id FROM {post} WHERE author_id = new.id); '
+        'END',
+    )
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement.format(**tables))
+
+
+def rebuild(connection):
+    """Заполняет индекс заново по всем постам."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM {}'.format(INDEX_TABLE))
+        cursor.execute(
+            'INSERT INTO {}(rowid, text, group_title, author_name) '
+            'SELECT {} FROM {} AS post'.format(
+                INDEX_TABLE, _index_row('post'), Post._meta.db_table
+            )
+        )
+
+
+def uninstall(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for suffix in ('insert', 'delete', 'update', 'group', 'author'):
+            cursor.execute(
+                'DROP TRIGGER IF EXISTS {}_{}'.format(INDEX_TABLE, suffix)
+            )
+        cursor.execute('DROP TABLE IF EXISTS {}'.format(INDEX_TABLE))
@@ -0,0 +1,19 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def cursor_url(context, cursor=None):
+    """
+    Адрес текущей страницы с другим курсором. Остальные GET-параметры
+    сохраняются, без курсора получается ссылка на первую страницу.
+    """
+    request = context['request']
+    query = request.GET.copy()
+    query.pop('cursor', None)
+    if cursor:
+        query['cursor'] = cursor
+    if not query:
+        return request.path
+    return '{}?{}'.format(request.path, query.urlencode())
@@ -0,0 +1,43 @@
+from django import template
+
+from yatube.settings import POST_IMAGE_VARIANTS
+
+register = template.Library()
+
+
+def srcset(variants):
+    return ', '.join(
+        f'{variant.file.url} {variant.width}w' for variant in variants
+    )
+
+
+@register.inclusion_tag('posts/includes/post_image.html')
+def post_image(post, name='card'):
+    """
+    Адаптивная картинка поста из заранее подготовленных вариантов:
+    для каждого формата выводится srcset по всем ширинам, браузер сам
+    выбирает подходящую по sizes. Пока вариантов нет, показывается
+    оригинал. Хранилище миниатюр при этом не читается.
+    """
+    spec = POST_IMAGE_VARIANTS[name]
+    by_format = {}
+    for variant in sorted(post.image_variants.all(), key=lambda v: v.width):
+        if variant.name == name:
+            by_format.setdefault(variant.format, []).append(variant)
+    fallback = by_format.pop('jpeg', [])
+    width, height = spec['size']
+    fitting = [
+        variant for variant in fallback
+        if variant.width <= width and variant.height <= height
+    ]
+    default = fitting[-1] if fitting else next(iter(fallback), None)
+    return {
+        'post': post,
+        'sources': [
+            {'type': f'image/{image_format}', 'srcset': srcset(variants)}
+            for image_format, variants in by_format.items()
+        ],
+        'fallback': default,
+        'srcset': srcset(fallback),
+        'sizes': spec['sizes'],
+    }
@@ -0,0 +1,56 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from posts import benchmark
+from posts.models import Follow, Post
+
+
+class BenchmarkTest(TestCase):
+    def test_seed_and_run(self):
+        """Сценарии прогоняются на засеянных данных и дают все метрики."""
+        benchmark.seed(users=5, groups=2, posts=30, comments=10, follows=6)
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(Follow.objects.count(), 6)
+        results = benchmark.run(requests=2)
+        self.assertEqual(set(results), set(benchmark.scenarios()))
+        for name, result in results.items():
+            with self.subTest(name=name):
+                self.assertEqual(
+                    set(result), {'p50', 'p95', 'p99', 'queries', 'bytes'}
+                )
+                self.assertIsInstance(result['queries'], int)
+        # Ленты и пользователь сессии берутся из кэша, а запись всегда
+        # доходит до базы.
+        self.assertGreater(results['post_create']['queries'], 0)
+
+    def test_missing_objects_skip_scenarios(self):
+        """Без групп и постов их сценарии пропускаются, а не падают."""
+        benchmark.seed(users=2, groups=0, posts=0, comments=0, follows=1)
+        results = benchmark.run(requests=1)
+        self.assertNotIn('group_list', results)
+        self.assertNotIn('post_detail', results)
+        self.assertNotIn('add_comment', results)
+        self.assertIn('index', results)
+
+    def test_command_needs_users(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark', users=0, stdout=StringIO())
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmark.percentile(values, 50), 50)
+        self.assertEqual(benchmark.percentile(values, 99), 99)
+        self.assertEqual(benchmark.percentile([7], 95), 7)
+
+    def test_compare(self):
+        """Рост числа запросов - всегда регрессия, время - сверх допуска."""
+        baseline = {'index': {'p95': 10.0, 'queries': 2, 'bytes': 1000}}
+        self.assertEqual(benchmark.compare(
+            {'index': {'p95': 12.0, 'queries': 2, 'bytes': 1000}}, baseline
+        ), [])
+        self.assertEqual(benchmark.compare(
+            {'index': {'p95': 13.0, 'queries': 3, 'bytes': 1000}}, baseline
+        ), ['index.p95: 13.0 > 10.0', 'index.queries: 3 > 2'])
@@ -0,0 +1,129 @@
+import time
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from core import page_cache, tasks
+from posts import timeline
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Kelly')
+        cls.reader = User.objects.create_user(username='Creed')
+        cls.group = Group.objects.create(
+            title='Приемная', slug='reception', description='-'
+        )
+        cls.post = Post.objects.create(
+            text='Звонок', author=cls.author, group=cls.group
+        )
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list', args=[cls.group.slug]),
+            'profile': reverse('posts:profile', args=[cls.author.username]),
+            'detail': reverse('posts:post_detail', args=[cls.post.pk]),
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def revalidate(self, url, etag):
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_unchanged_pages_return_304(self):
+        self.client.force_login(self.reader)
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                etag = self.client.get(url)['ETag']
+                response = self.revalidate(url, etag)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+                self.assertEqual(response.content, b'')
+
+    def test_cached_anonymous_page_returns_304(self):
+        etag = self.client.get(self.urls['index'])['ETag']
+        response = self.revalidate(self.urls['index'], etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_new_post_changes_etag(self):
+        etags = {
+            name: self.client.get(url)['ETag']
+            for name, url in self.urls.items()
+        }
+        Post.objects.create(text='Факс', author=self.author, group=self.group)
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.revalidate(url, etags[name])
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertNotEqual(response['ETag'], etags[name])
+
+    def test_comment_changes_post_etag(self):
+        url = self.urls['detail']
+        etag = self.client.get(url)['ETag']
+        Comment.objects.create(post=self.post, author=self.reader, text='Ок')
+        self.assertEqual(self.revalidate(url, etag).status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_user(self):
+        anonymous = self.client.get(self.urls['index'])['ETag']
+        self.client.force_login(self.reader)
+        self.assertNotEqual(self.client.get(self.urls['index'])['ETag'],
+                            anonymous)
+
+    def test_follow_changes_follow_index_and_profile(self):
+        self.client.force_login(self.reader)
+        urls = (reverse('posts:follow_index'), self.urls['profile'])
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        Follow.objects.create(user=self.reader, author=self.author)
+        for url, etag in zip(urls, etags):
+            with self.subTest(url=url):
+                self.assertEqual(
+                    self.revalidate(url, etag).status_code, HTTPStatus.OK
+                )
+
+    @mock.patch.object(tasks, 'TASKS_EAGER', False)
+    def test_background_delivery_changes_follow_etag(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+        url = reverse('posts:follow_index')
+        new_post = Post.objects.create(text='Принтер', author=self.author)
+        etag = self.client.get(url)['ETag']
+        timeline.deliver(new_post.pk)
+        response = self.revalidate(url, etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertContains(response, 'Принтер')
+
+    def test_unknown_profile_is_404(self):
+        response = self.client.get(reverse('posts:profile', args=['nobody']))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_if_modified_since(self):
+        cache.set(page_cache.MODIFIED_KEY, time.time() - 60, None)
+        response = self.client.get(self.urls['group'])
+        modified = response['Last-Modified']
+        response = self.client.get(
+            self.urls['group'], HTTP_IF_MODIFIED_SINCE=modified
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+        Post.objects.create(text='Ксерокс', author=self.author)
+        response = self.client.get(
+            self.urls['group'], HTTP_IF_MODIFIED_SINCE=modified
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_fresh_change_has_no_last_modified(self):
+        page_cache.purge('index')
+        self.assertIsNone(page_cache.last_modified())
+        cache.set(page_cache.MODIFIED_KEY, 1600000000.5, None)
+        self.assertEqual(
+            http_date(page_cache.last_modified().timestamp()),
+            'Sun, 13 Sep 2020 12:26:40 GMT',
+        )
@@ -0,0 +1,102 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import AuthorStats, Comment, Follow, Post
+
+User = get_user_model()
+
+
+class CountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='TobyFlenderson')
+        cls.reader = User.objects.create_user(username='HollyFlax')
+
+    def stats(self, user):
+        return AuthorStats.objects.get(user=user)
+
+    def test_counters_follow_changes(self):
+        """Счетчики меняются при создании и удалении объектов."""
+        post = Post.objects.create(text='text', author=self.author)
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='comment'
+        )
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        comment.delete()
+        follow.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+        post.delete()
+        self.assertEqual(self.stats(self.author).posts_count, 0)
+
+    def test_comment_delete_after_drift(self):
+        """Удаление комментария при разошедшемся счетчике не падает."""
+        post = Post.objects.create(text='text', author=self.author)
+        comment = Comment.objects.create(
+            post=post, author=self.reader, text='comment'
+        )
+        Post.objects.filter(pk=post.pk).update(comments_count=0)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_reconcile_counters_fixes_drift(self):
+        """Команда reconcile_counters исправляет расхождения."""
+        post = Post.objects.create(text='text', author=self.author)
+        Comment.objects.create(post=post, author=self.reader, text='text')
+        AuthorStats.objects.filter(user=self.author).update(posts_count=7)
+        AuthorStats.objects.filter(user=self.reader).delete()
+        Post.objects.filter(pk=post.pk).update(comments_count=0)
+        call_command('reconcile_counters', stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        self.assertEqual(self.stats(self.author).posts_count, 1)
+        self.assertEqual(self.stats(self.reader).posts_count, 0)
+
+    def test_pages_do_not_aggregate(self):
+        """Профиль и страница поста не выполняют COUNT-запросов."""
+        post = Post.objects.create(text='text', author=self.author)
+        urls = (
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:post_detail', args=[post.pk]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url)
+                self.assertContains(response, 'Всего постов')
+                self.assertFalse([
+                    query for query in context.captured_queries
+                    if 'COUNT(' in query['sql']
+                ])
+
+    def test_delete_user_with_follows_and_posts(self):
+        """Удаление пользователя не уводит счетчики ниже нуля."""
+        leaving = User.objects.create_user(username='MichaelScott')
+        Post.objects.create(text='text', author=self.author)
+        Post.objects.create(text='text', author=leaving)
+        Follow.objects.create(user=leaving, author=self.author)
+        Follow.objects.create(user=self.author, author=leaving)
+        leaving_id = leaving.pk
+        leaving.delete()
+        self.assertFalse(
+            AuthorStats.objects.filter(user_id=leaving_id).exists()
+        )
+        stats = self.stats(self.author)
+        self.assertEqual(stats.followers_count, 0)
+        self.assertEqual(stats.following_count, 0)
+        self.assertEqual(stats.posts_count, 1)
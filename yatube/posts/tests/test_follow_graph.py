@@ -0,0 +1,157 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import follow_graph
+from posts.models import Follow
+from yatube.settings import NUM_OF_FOLLOWS
+
+User = get_user_model()
+
+
+class FollowGraphTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='Oscar')
+        cls.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(5)
+        ]
+        for author in cls.authors[:3]:
+            Follow.objects.create(user=cls.reader, author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_following_ids_are_cached(self):
+        with self.assertNumQueries(1):
+            ids = follow_graph.following_ids(self.reader.pk)
+        self.assertEqual(
+            ids, tuple(sorted(author.pk for author in self.authors[:3]))
+        )
+        with self.assertNumQueries(0):
+            follow_graph.following_ids(self.reader.pk)
+
+    def test_batched_membership(self):
+        author_ids = [author.pk for author in self.authors]
+        with self.assertNumQueries(1):
+            followed = follow_graph.following_among(
+                self.reader.pk, author_ids
+            )
+        self.assertEqual(followed, set(author_ids[:3]))
+        with self.assertNumQueries(0):
+            self.assertTrue(follow_graph.is_following(
+                self.reader.pk, author_ids[0]
+            ))
+            self.assertFalse(follow_graph.is_following(
+                self.reader.pk, author_ids[4]
+            ))
+
+    def test_follow_and_unfollow_invalidate(self):
+        author = self.authors[4]
+        follow_graph.following_ids(self.reader.pk)
+        Follow.objects.create(user=self.reader, author=author)
+        self.assertTrue(follow_graph.is_following(self.reader.pk, author.pk))
+        Follow.objects.filter(user=self.reader, author=author).delete()
+        self.assertFalse(follow_graph.is_following(self.reader.pk, author.pk))
+
+    def test_set_read_before_commit_is_dropped(self):
+        """
+        Набор, прочитанный до коммита подписки и положенный в кэш уже
+        после него, не выдается как актуальный.
+        """
+        callbacks = []
+        cache_set = cache.set
+
+        def commit_then_set(*args, **kwargs):
+            while callbacks:
+                callbacks.pop()()
+            cache_set(*args, **kwargs)
+
+        with mock.patch.object(
+            follow_graph.transaction, 'on_commit', callbacks.append
+        ):
+            Follow.objects.create(user=self.reader, author=self.authors[4])
+        with mock.patch.object(follow_graph.cache, 'set', commit_then_set):
+            follow_graph.following_ids(self.reader.pk)
+        with self.assertNumQueries(1):
+            follow_graph.following_ids(self.reader.pk)
+
+    def test_invalidate_all(self):
+        follow_graph.following_ids(self.reader.pk)
+        Follow.objects.bulk_create(
+            [Follow(user=self.reader, author=self.authors[3])]
+        )
+        follow_graph.invalidate_all()
+        self.assertTrue(
+            follow_graph.is_following(self.reader.pk, self.authors[3].pk)
+        )
+
+    def test_profile_uses_cached_set(self):
+        self.client.force_login(self.reader)
+        for author, expected in ((self.authors[0], True),
+                                 (self.authors[4], False)):
+            with self.subTest(author=author.username):
+                response = self.client.get(
+                    reverse('posts:profile', args=[author.username])
+                )
+                self.assertIs(response.context['following'], expected)
+
+
+class FollowListTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Angela')
+        cls.viewer = User.objects.create_user(username='Dwight')
+        cls.fans = [
+            User.objects.create_user(username=f'cat{number}')
+            for number in range(NUM_OF_FOLLOWS + 3)
+        ]
+        for fan in cls.fans:
+            Follow.objects.create(user=fan, author=cls.author)
+        Follow.objects.create(user=cls.viewer, author=cls.fans[-1])
+        cls.followers_url = reverse('posts:followers', args=['Angela'])
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.viewer)
+
+    def test_followers_are_paginated(self):
+        response = self.client.get(self.followers_url)
+        people = response.context['people']
+        self.assertEqual(len(people), NUM_OF_FOLLOWS)
+        self.assertEqual(people[0], (self.fans[-1], True))
+        self.assertFalse(any(followed for _, followed in people[1:]))
+        response = self.client.get(
+            self.followers_url,
+            {'cursor': response.context['page_obj'].next_cursor},
+        )
+        self.assertEqual(len(response.context['people']), 3)
+
+    def test_following_list(self):
+        response = self.client.get(
+            reverse('posts:following', args=[self.fans[0].username])
+        )
+        self.assertEqual(response.context['people'], [(self.author, False)])
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        self.client.get(self.followers_url)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(
+                reverse('posts:following', args=[self.fans[0].username])
+            )
+        single = len(context)
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.followers_url)
+        self.assertEqual(len(context), single)
+
+    def test_unknown_user_is_404(self):
+        response = self.client.get(reverse('posts:followers', args=['nobody']))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,148 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from core import tasks
+from posts import follow_graph, follows, timeline
+from posts.models import AuthorStats, Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class AtomicFollowTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Ryan')
+        cls.reader = User.objects.create_user(username='Kelly2')
+        cls.post = Post.objects.create(text='Идея', author=cls.author)
+        cls.follow_url = reverse('posts:follow_author', args=[cls.author.pk])
+        cls.unfollow_url = reverse(
+            'posts:unfollow_author', args=[cls.author.pk]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def stats(self, user):
+        return AuthorStats.objects.get(user=user)
+
+    def test_follow_is_idempotent(self):
+        self.assertTrue(follows.follow(self.reader.pk, self.author.pk))
+        self.assertFalse(follows.follow(self.reader.pk, self.author.pk))
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        self.assertEqual(self.stats(self.reader).following_count, 1)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=self.post
+        ).exists())
+        self.assertTrue(
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+        )
+
+    def test_unfollow_is_idempotent(self):
+        follows.follow(self.reader.pk, self.author.pk)
+        self.assertTrue(follows.unfollow(self.reader.pk, self.author.pk))
+        self.assertFalse(follows.unfollow(self.reader.pk, self.author.pk))
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+        self.assertEqual(self.stats(self.reader).following_count, 0)
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertFalse(
+            follow_graph.is_following(self.reader.pk, self.author.pk)
+        )
+
+    @mock.patch.object(tasks, 'TASKS_EAGER', False)
+    def test_backfill_is_queued_after_commit(self):
+        """Лента заполняется задачей после коммита, а не в транзакции."""
+        follows.follow(self.reader.pk, self.author.pk)
+        self.assertFalse(TimelineEntry.objects.exists())
+        timeline.catch_up(self.reader.pk, self.author.pk)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=self.reader, post=self.post
+        ).exists())
+
+    def test_backfill_skips_cancelled_follow(self):
+        timeline.catch_up(self.reader.pk, self.author.pk)
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_self_and_missing_author_are_ignored(self):
+        self.assertFalse(follows.follow(self.reader.pk, self.reader.pk))
+        self.assertFalse(follows.follow(self.reader.pk, 10 ** 6))
+        self.assertFalse(Follow.objects.exists())
+
+    def test_double_click_returns_same_json(self):
+        for _ in range(2):
+            response = self.client.post(
+                self.follow_url, HTTP_ACCEPT='application/json'
+            )
+            self.assertEqual(response.json(), {
+                'author': self.author.pk,
+                'following': True,
+                'followers_count': 1,
+            })
+        response = self.client.post(
+            self.unfollow_url, HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(response.json()['following'], False)
+        self.assertEqual(response.json()['followers_count'], 0)
+
+    def test_htmx_gets_button_fragment(self):
+        response = self.client.post(self.follow_url, HTTP_HX_REQUEST='true')
+        self.assertTemplateUsed(response, 'posts/includes/follow_button.html')
+        self.assertContains(response, self.unfollow_url)
+        self.assertNotContains(response, '<html')
+
+    def test_form_post_redirects_back(self):
+        profile_url = reverse('posts:profile', args=[self.author.username])
+        response = self.client.post(self.follow_url, {'next': profile_url})
+        self.assertRedirects(response, profile_url)
+        response = self.client.post(
+            self.unfollow_url, {'next': 'https://evil.example/'}
+        )
+        self.assertRedirects(response, reverse('posts:follow_index'))
+
+    def test_self_follow_form_redirects_back(self):
+        profile_url = reverse('posts:profile', args=[self.reader.username])
+        response = self.client.post(
+            reverse('posts:follow_author', args=[self.reader.pk]),
+            {'next': profile_url},
+        )
+        self.assertRedirects(response, profile_url)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_errors(self):
+        self.assertEqual(self.client.get(self.follow_url).status_code, 405)
+        self_follow_url = reverse('posts:follow_author', args=[self.reader.pk])
+        response = self.client.post(
+            self_follow_url, HTTP_ACCEPT='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json())
+        response = self.client.post(
+            self_follow_url, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            reverse('posts:follow_author', args=[10 ** 6])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.client.logout()
+        response = self.client.post(self.follow_url)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_orm_follow_uses_same_handlers(self):
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.stats(self.author).followers_count, 1)
+        Follow.objects.filter(user=self.reader).delete()
+        self.assertEqual(self.stats(self.author).followers_count, 0)
+
+    def test_profile_shows_post_form(self):
+        response = self.client.get(
+            reverse('posts:profile', args=[self.author.username])
+        )
+        self.assertContains(response, f'action="{self.follow_url}"')
@@ -0,0 +1,150 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import images
+from posts.models import ImageVariant, Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+IMAGE_CONST = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ImagePipelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='GabeLewis')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.author)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def create_post(self):
+        return Post.objects.create(
+            text='picture',
+            author=self.author,
+            image=SimpleUploadedFile(
+                name='small.gif', content=IMAGE_CONST, content_type='image/gif'
+            ),
+        )
+
+    def test_process_builds_variants_and_dimensions(self):
+        """Обработка сохраняет размеры оригинала и готовые варианты."""
+        post = self.create_post()
+        images.process(post.pk)
+        post.refresh_from_db()
+        self.assertEqual((post.image_width, post.image_height), (2, 1))
+        variants = ImageVariant.objects.filter(
+            post=post, name='card', format='jpeg'
+        ).order_by('width')
+        self.assertEqual(
+            [(variant.width, variant.height) for variant in variants],
+            [(340, 170), (678, 339), (1016, 508)]
+        )
+        for variant in variants:
+            self.assertTrue(variant.file.storage.exists(variant.file.name))
+        self.assertEqual(
+            ImageVariant.objects.filter(post=post).count(),
+            3 * len(images.supported_formats())
+        )
+
+    def test_quality_is_configured_per_width(self):
+        """Каждая ширина сжимается со своим качеством."""
+        post = self.create_post()
+        with mock.patch.object(
+            images, 'encode', wraps=images.encode
+        ) as encode:
+            images.process(post.pk)
+        used = {
+            (call.args[0].width, call.args[2])
+            for call in encode.call_args_list
+        }
+        self.assertEqual(used, {(340, 70), (678, 75), (1016, 65)})
+
+    def test_feed_reads_precomputed_variants(self):
+        """
+        Лента выводит готовые варианты со srcset и не обращается
+        к хранилищу миниатюр.
+        """
+        post = self.create_post()
+        images.process(post.pk)
+        variant = ImageVariant.objects.get(
+            post=post, format='jpeg', width=678
+        )
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, f'src="{variant.file.url}"')
+        self.assertContains(response, f'{variant.file.url} 678w')
+        self.assertContains(response, 'sizes="(max-width: 992px) 100vw')
+        self.assertFalse([
+            query for query in context.captured_queries
+            if 'thumbnail_kvstore' in query['sql']
+        ])
+
+    def test_processing_refreshes_cached_pages(self):
+        """После обработки закэшированные страницы показывают варианты."""
+        post = self.create_post()
+        cache.clear()
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:post_detail', args=[post.pk]),
+        )
+        for client in (self.client, self.authorized_client):
+            for url in urls:
+                client.get(url)
+        images.process(post.pk)
+        variant = ImageVariant.objects.get(
+            post=post, name='card', format='jpeg', width=678
+        )
+        for client in (self.client, self.authorized_client):
+            with self.subTest(authorized=client is self.authorized_client):
+                response = client.get(urls[0])
+                self.assertContains(response, f'{variant.file.url} 678w')
+                response = client.get(urls[1])
+                self.assertContains(response, 'srcset=')
+
+    def test_original_is_shown_until_processed(self):
+        """Пока варианты не готовы, показывается оригинал."""
+        post = self.create_post()
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', args=[post.pk])
+        )
+        self.assertContains(response, post.image.url)
+
+    def test_form_schedules_processing(self):
+        """Сохранение формы с картинкой ставит ее в обработку."""
+        with mock.patch.object(images, 'schedule') as schedule:
+            self.authorized_client.post(
+                reverse('posts:post_create'),
+                data={
+                    'text': 'with image',
+                    'image': SimpleUploadedFile(
+                        name='new.gif',
+                        content=IMAGE_CONST,
+                        content_type='image/gif'
+                    ),
+                },
+            )
+        schedule.assert_called_once_with(Post.objects.get(text='with image'))
@@ -0,0 +1,97 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.shortcuts import render
+from django.test import TestCase
+from django.urls import reverse
+
+from core import page_cache
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='RoyAnderson')
+        cls.group = Group.objects.create(
+            title='Склад', slug='warehouse', description='-'
+        )
+        cls.other_group = Group.objects.create(
+            title='Офис', slug='office', description='-'
+        )
+        cls.post = Post.objects.create(
+            text='Погрузчик', author=cls.author, group=cls.group
+        )
+        cls.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse('posts:group_list', args=[cls.group.slug]),
+            'other_group': reverse(
+                'posts:group_list', args=[cls.other_group.slug]
+            ),
+            'profile': reverse('posts:profile', args=[cls.author.username]),
+            'detail': reverse('posts:post_detail', args=[cls.post.pk]),
+        }
+
+    def setUp(self):
+        cache.clear()
+        for url in self.urls.values():
+            self.client.get(url)
+
+    def cached(self, name):
+        """Страница отдана из кэша: view не вызывался и контекста нет."""
+        return self.client.get(self.urls[name]).context is None
+
+    def test_anonymous_pages_are_cached_with_headers(self):
+        for name in self.urls:
+            with self.subTest(page=name):
+                self.assertTrue(self.cached(name))
+        response = self.client.get(self.urls['detail'])
+        self.assertIn(f'post-{self.post.pk}', response['Surrogate-Key'])
+        self.assertIn(f'author-{self.author.pk}', response['Surrogate-Key'])
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('s-maxage', response['Cache-Control'])
+
+    def test_logged_in_pages_are_private(self):
+        self.client.force_login(self.author)
+        response = self.client.get(self.urls['index'])
+        self.assertIsNotNone(response.context)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_purge_during_render_is_not_stored(self):
+        """Страница, собранная во время сброса, не кэшируется."""
+        cache.clear()
+
+        def render_and_purge(*args, **kwargs):
+            response = render(*args, **kwargs)
+            page_cache.purge(f'post-{self.post.pk}')
+            return response
+
+        with mock.patch('posts.views.render', render_and_purge):
+            self.client.get(self.urls['detail'])
+        self.assertFalse(self.cached('detail'))
+        self.assertTrue(self.cached('detail'))
+
+    def test_comment_purges_only_post_page(self):
+        Comment.objects.create(post=self.post, author=self.author, text='Да')
+        self.assertFalse(self.cached('detail'))
+        self.assertTrue(self.cached('index'))
+        self.assertTrue(self.cached('profile'))
+
+    def test_post_change_purges_its_lists(self):
+        """Перенос поста в другую группу сбрасывает обе группы."""
+        self.post.group = self.other_group
+        self.post.save()
+        for name in ('index', 'group', 'other_group', 'profile', 'detail'):
+            with self.subTest(page=name):
+                self.assertFalse(self.cached(name))
+
+    def test_follow_purges_profiles(self):
+        reader = User.objects.create_user(username='Pam')
+        Follow.objects.create(user=reader, author=self.author)
+        self.assertFalse(self.cached('profile'))
+        self.assertFalse(self.cached('detail'))
+        self.assertTrue(self.cached('other_group'))
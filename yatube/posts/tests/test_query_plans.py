@@ -0,0 +1,81 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+from yatube.settings import NUM_OF_POSTS
+
+User = get_user_model()
+
+FEED_TABLES = re.compile(
+    r'"posts_(post|comment|follow|timelineentry|group|authorstats)"'
+)
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?\w+$')
+SORT = 'USE TEMP B-TREE FOR'
+
+
+class QueryPlanTest(TestCase):
+    """
+    Запросы лент и страницы поста идут по индексам: без полного
+    сканирования таблиц и без сортировки во временном B-дереве.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='RyanHoward')
+        cls.reader = User.objects.create_user(username='KellyKapoor')
+        cls.group = Group.objects.create(title='Temps', slug='temps')
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for i in range(NUM_OF_POSTS + 3):
+            Post.objects.create(
+                text=f'post {i}', author=cls.author, group=cls.group
+            )
+        cls.post = Post.objects.first()
+        Comment.objects.create(post=cls.post, author=cls.reader, text='hi')
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.author}),
+            reverse('posts:follow_index'),
+            reverse('posts:post_detail', args=[cls.post.pk]),
+        )
+
+    def plans(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.reader_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        next_cursor = getattr(response.context.get('page_obj'),
+                              'next_cursor', None)
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and FEED_TABLES.search(query['sql'])
+        ]
+        with connection.cursor() as cursor:
+            for sql in queries:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                yield sql, [row[-1] for row in cursor.fetchall()]
+        if next_cursor:
+            yield from self.plans(url + '?cursor=' + next_cursor)
+
+    def test_feed_queries_use_indexes(self):
+        for url in self.urls:
+            for sql, plan in self.plans(url):
+                with self.subTest(url=url, sql=sql):
+                    self.assertFalse(
+                        [step for step in plan if FULL_SCAN.match(step)],
+                        f'Полное сканирование таблицы: {plan}'
+                    )
+                    self.assertFalse(
+                        [step for step in plan if SORT in step],
+                        f'Сортировка без индекса: {plan}'
+                    )
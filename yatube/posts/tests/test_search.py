@@ -0,0 +1,126 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import search
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class SearchBackendTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='KevinMalone', first_name='Кевин'
+        )
+        cls.group = Group.objects.create(
+            title='Бухгалтерия', slug='accounting', description='-'
+        )
+        cls.chili = Post.objects.create(
+            text='Рецепт знаменитого чили', author=cls.author
+        )
+        cls.report = Post.objects.create(
+            text='Квартальный отчет', author=cls.author, group=cls.group
+        )
+
+    def setUp(self):
+        self.backend = search.SQLiteSearchBackend()
+
+    def test_search_by_text_group_and_author(self):
+        """Поиск находит посты по тексту, группе и имени автора."""
+        cases = {
+            'чили': [self.chili.pk],
+            'бухгалтерия': [self.report.pk],
+            'кевин отчет': [self.report.pk],
+        }
+        for query, expected in cases.items():
+            with self.subTest(query=query):
+                self.assertEqual(self.backend.search_ids(query), expected)
+
+    def test_prefix_and_operators(self):
+        """Слова ищутся по префиксу, синтаксис FTS5 в запросе не ломает."""
+        self.assertEqual(self.backend.search_ids('знаменит'), [self.chili.pk])
+        self.assertEqual(self.backend.search_ids('(чили" *'), [self.chili.pk])
+        self.assertEqual(self.backend.search_ids('" * -'), [])
+
+    def test_index_follows_changes(self):
+        """Триггеры обновляют индекс при изменении постов, групп и авторов."""
+        Post.objects.filter(pk=self.chili.pk).update(text='Пролитый чили')
+        self.assertEqual(self.backend.search_ids('пролитый'), [self.chili.pk])
+        self.group.title = 'Склад'
+        self.group.save()
+        self.assertEqual(self.backend.search_ids('склад'), [self.report.pk])
+        self.author.last_name = 'Мэлоун'
+        self.author.save()
+        self.assertEqual(
+            sorted(self.backend.search_ids('мэлоун')),
+            [self.chili.pk, self.report.pk]
+        )
+        Post.objects.filter(pk=self.report.pk).delete()
+        self.assertEqual(self.backend.search_ids('склад'), [])
+
+    def test_basic_backend_matches_all_words(self):
+        backend = search.BasicSearchBackend()
+        self.assertEqual(
+            backend.search_ids('KevinMalone чили'), [self.chili.pk]
+        )
+
+    def test_default_backend_follows_vendor(self):
+        """Без SEARCH_BACKEND FTS5 берется только для SQLite."""
+        cases = (
+            ('sqlite', search.SQLiteSearchBackend),
+            ('postgresql', search.BasicSearchBackend),
+            ('mysql', search.BasicSearchBackend),
+        )
+        for vendor, backend in cases:
+            with self.subTest(vendor=vendor), \
+                    mock.patch.object(search, 'SEARCH_BACKEND', None), \
+                    mock.patch.object(search.connection, 'vendor', vendor):
+                self.assertIsInstance(search.get_backend(), backend)
+        with mock.patch.object(search, 'SEARCH_BACKEND', 'basic'):
+            self.assertIsInstance(
+                search.get_backend(), search.BasicSearchBackend
+            )
+
+
+class SearchViewTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='OscarMartinez')
+        cls.posts = Post.objects.bulk_create(
+            Post(text='Налоги {}'.format(i), author=cls.author)
+            for i in range(15)
+        )
+
+    def test_search_page(self):
+        response = self.client.get(reverse('posts:search'), {'q': 'налоги'})
+        self.assertTemplateUsed(response, 'posts/search.html')
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 15)
+        self.assertEqual(len(page_obj), 10)
+        response = self.client.get(
+            reverse('posts:search'), {'q': 'налоги', 'page': 2}
+        )
+        self.assertEqual(len(response.context['page_obj']), 5)
+
+    def test_empty_query(self):
+        response = self.client.get(reverse('posts:search'))
+        self.assertEqual(response.context['page_obj'].paginator.count, 0)
+
+    def test_admin_search_uses_index(self):
+        admin = User.objects.create_superuser('admin', 'a@a.ru', 'pass')
+        client = Client()
+        client.force_login(admin)
+        with mock.patch.object(
+            search.SQLiteSearchBackend, 'search_ids', return_value=[]
+        ) as search_ids:
+            response = client.get(
+                reverse('admin:posts_post_changelist'), {'q': 'налоги'}
+            )
+        search_ids.assert_called_once_with('налоги')
+        self.assertEqual(response.context['cl'].result_count, 0)
@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import timeline
+from posts.models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='StanleyHudson')
+        cls.author = User.objects.create_user(username='PhyllisVance')
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+
+    def feed(self):
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_new_post_is_fanned_out_to_followers(self):
+        """Новый пост автора попадает в ленту подписчика."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='new', author=self.author)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(self.feed(), [post])
+
+    def test_follow_backfills_and_unfollow_trims(self):
+        """
+        Подписка добавляет в ленту старые посты автора,
+        отписка их убирает.
+        """
+        posts = [
+            Post.objects.create(text=str(i), author=self.author)
+            for i in range(3)
+        ]
+        follow = Follow.objects.create(user=self.reader, author=self.author)
+        self.assertEqual(self.feed(), posts[::-1])
+        follow.delete()
+        self.assertFalse(TimelineEntry.objects.filter(user=self.reader))
+        self.assertEqual(self.feed(), [])
+
+    @mock.patch.object(timeline, 'TIMELINE_CELEBRITY_FOLLOWERS', 1)
+    def test_celebrity_posts_are_merged_on_read(self):
+        """
+        Посты знаменитости не рассылаются при публикации, но
+        появляются в ленте при чтении.
+        """
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(text='celebrity', author=self.author)
+        self.assertFalse(TimelineEntry.objects.filter(post=post).exists())
+        self.assertEqual(self.feed(), [post])
+        self.assertEqual(self.feed(), [post])
@@ -0,0 +1,129 @@
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts import transfer
+from posts.models import AuthorStats, Comment, Group, Post, TimelineEntry
+
+User = get_user_model()
+
+
+class TransferCommandsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='CreedBratton')
+        cls.reader = User.objects.create_user(username='TobyFlenderson')
+        cls.group = Group.objects.create(
+            title='Контроль качества', slug='quality', description='-'
+        )
+        cls.pub_date = datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        for i in range(5):
+            Post.objects.create(
+                text=f'Пост {i}', author=self.author, group=self.group
+            )
+        Post.objects.update(pub_date=self.pub_date)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def roundtrip(self, name):
+        expected = list(Post.objects.values_list(
+            'id', 'text', 'pub_date', 'author_id', 'group_id'
+        ))
+        call_command('export_posts', 'post', self.path(name), verbosity=0)
+        Post.objects.all().delete()
+        call_command(
+            'import_posts', 'post', self.path(name), batch_size=2, verbosity=0
+        )
+        self.assertEqual(
+            list(Post.objects.values_list(
+                'id', 'text', 'pub_date', 'author_id', 'group_id'
+            )),
+            expected
+        )
+
+    def test_ndjson_roundtrip(self):
+        """Выгрузка и загрузка NDJSON сохраняют id, связи и даты."""
+        self.roundtrip('posts.ndjson')
+
+    def test_csv_roundtrip(self):
+        self.roundtrip('posts.csv')
+
+    def test_import_resumes_from_checkpoint(self):
+        """Загрузка пропускает строки до отметки и удаляет ее в конце."""
+        call_command(
+            'export_posts', 'post', self.path('p.ndjson'), verbosity=0
+        )
+        Post.objects.all().delete()
+        transfer.save_checkpoint(self.path('p.ndjson.checkpoint'), 3)
+        call_command(
+            'import_posts', 'post', self.path('p.ndjson'), verbosity=0
+        )
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertFalse(os.path.exists(self.path('p.ndjson.checkpoint')))
+
+    def test_export_resumes_after_interruption(self):
+        """
+        Прерванная посреди пачки выгрузка дописывается с отметки без
+        повторов и обрывков строк.
+        """
+        call_command('export_posts', 'post', self.path('full.csv'),
+                     verbosity=0)
+        write = transfer.RowWriter.write
+        written = []
+
+        def interrupted_write(writer, row):
+            if len(written) == 3:
+                raise RuntimeError('Сбой')
+            written.append(row)
+            write(writer, row)
+
+        with mock.patch.object(transfer.RowWriter, 'write',
+                               interrupted_write):
+            with self.assertRaises(RuntimeError):
+                call_command('export_posts', 'post', self.path('p.csv'),
+                             chunk_size=2, verbosity=0)
+        self.assertTrue(os.path.exists(self.path('p.csv.checkpoint')))
+        call_command('export_posts', 'post', self.path('p.csv'),
+                     chunk_size=2, verbosity=0)
+        with open(self.path('p.csv')) as stream, \
+                open(self.path('full.csv')) as full:
+            self.assertEqual(stream.read(), full.read())
+        self.assertFalse(os.path.exists(self.path('p.csv.checkpoint')))
+
+    def test_import_rebuilds_counters_and_timelines(self):
+        """После загрузки в обход сигналов пересчитываются счетчики и ленты."""
+        post = Post.objects.first()
+        Comment.objects.create(post=post, author=self.reader, text='Да')
+        for model in ('post', 'comment'):
+            call_command(
+                'export_posts', model, self.path(f'{model}.ndjson'),
+                verbosity=0
+            )
+        Post.objects.all().delete()
+        self.reader.follower.create(author=self.author)
+        for model in ('post', 'comment'):
+            call_command(
+                'import_posts', model, self.path(f'{model}.ndjson'),
+                verbosity=0
+            )
+        self.assertEqual(
+            AuthorStats.objects.get(user=self.author).posts_count, 5
+        )
+        self.assertEqual(Post.objects.get(pk=post.pk).comments_count, 1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.reader).count(), 5
+        )
@@ -1,16 +1,25 @@
+import shutil
+import tempfile
+
 from django import forms
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, TestCase
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
 from posts.models import Comment, Follow, Group, Post
-from yatube.settings import NUM_OF_POSTS
+from posts.paginators import BACKWARD, CursorPaginator
+from yatube.settings import NUM_OF_COMMENTS, NUM_OF_POSTS
 
 User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
 
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class PostPagesTests(TestCase):
     @classmethod
     def setUpClass(cls):
@@ -61,6 +70,11 @@ class PostPagesTests(TestCase):
             ): 'posts/post_detail.html',
         }
 
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
     def setUp(self):
         self.guest_client = Client()
 
@@ -167,21 +181,199 @@ class PaginatorViewsTest(TestCase):
             ) for i in range(13)
         ])
 
+    def setUp(self):
+        # bulk_create не сбрасывает кэш страниц гостей.
+        cache.clear()
+
     def test_page_contains_records(self):
         """
         Проверка, что на первой странице находится 10 постов,
         а на второй странице 3 поста.
         """
-        params = {
-            reverse('posts:index'): NUM_OF_POSTS,
-            (
-                reverse('posts:index') + '?page=2'
-            ): Post.objects.count() - NUM_OF_POSTS,
-        }
-        for adress, count in params.items():
-            with self.subTest(adress=adress):
-                response = self.client.get(adress)
-                (len(response.context['page_obj']), count)
+        response = self.client.get(reverse('posts:index'))
+        first_page = response.context['page_obj']
+        self.assertEqual(len(first_page), NUM_OF_POSTS)
+        self.assertIsNone(first_page.previous_cursor)
+        response = self.client.get(
+            reverse('posts:index') + '?cursor=' + first_page.next_cursor
+        )
+        second_page = response.context['page_obj']
+        self.assertEqual(
+            len(second_page), Post.objects.count() - NUM_OF_POSTS
+        )
+        self.assertTrue(second_page.has_previous())
+        self.assertFalse(second_page.has_next())
+        self.assertIsNone(second_page.next_cursor)
+
+    def test_cursor_pages_do_not_overlap(self):
+        """
+        Курсоры вперед и назад возвращают те же посты без пропусков
+        и повторов, даже при одинаковой дате публикации.
+        """
+        Post.objects.update(pub_date=Post.objects.first().pub_date)
+        first_page = self.client.get(
+            reverse('posts:index')
+        ).context['page_obj']
+        second_page = self.client.get(
+            reverse('posts:index') + '?cursor=' + first_page.next_cursor
+        ).context['page_obj']
+        seen = [post.pk for post in first_page] + [
+            post.pk for post in second_page
+        ]
+        self.assertEqual(
+            seen, list(Post.objects.order_by('-id').values_list(
+                'pk', flat=True
+            ))
+        )
+        back_page = self.client.get(
+            reverse('posts:index') + '?cursor=' + second_page.previous_cursor
+        ).context['page_obj']
+        self.assertEqual(list(back_page), list(first_page))
+        self.assertFalse(back_page.has_previous())
+        self.assertEqual(back_page.next_cursor, first_page.next_cursor)
+
+    def test_broken_cursor_returns_first_page(self):
+        """Испорченный курсор открывает первую страницу."""
+        response = self.client.get(reverse('posts:index') + '?cursor=broken')
+        self.assertFalse(response.context['page_obj'].has_previous())
+        self.assertEqual(len(response.context['page_obj']), NUM_OF_POSTS)
+
+    def test_forged_cursor_has_no_next_page(self):
+        """
+        Курсор назад от несуществующей записи не дает ссылки вперед:
+        соседние страницы определяются по базе, а не по курсору.
+        """
+        paginator = CursorPaginator(Post.objects.all(), NUM_OF_POSTS)
+        oldest = Post.objects.order_by('pub_date', 'id').first()
+        forged = paginator.encode_cursor(
+            BACKWARD, {'pub_date': oldest.pub_date, 'id': 0}
+        )
+        page = paginator.get_page(forged)
+        self.assertEqual(len(page), NUM_OF_POSTS)
+        self.assertTrue(page.has_previous())
+        self.assertFalse(page.has_next())
+        self.assertIsNone(page.next_cursor)
+
+    def test_links_keep_query_string(self):
+        """Ссылки навигации меняют только курсор."""
+        url = reverse('posts:index')
+        first = self.client.get(url, {'tab': 'new'})
+        cursor = first.context['page_obj'].next_cursor
+        second = self.client.get(url, {'tab': 'new', 'cursor': cursor})
+        self.assertContains(second, 'href="{}?tab=new"'.format(url))
+        self.assertContains(
+            second,
+            'href="{}?tab=new&amp;cursor={}"'.format(
+                url, second.context['page_obj'].previous_cursor
+            ),
+        )
+
+
+class FeedQueryCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='KevinMalone')
+        cls.writer = User.objects.create_user(username='AndyBernard')
+        cls.group = Group.objects.create(title='Cornell', slug='cornell')
+        cls.reader_client = Client()
+        cls.reader_client.force_login(cls.reader)
+        Follow.objects.create(user=cls.reader, author=cls.writer)
+        Post.objects.create(text='first', author=cls.writer, group=cls.group)
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': cls.group.slug}),
+            reverse('posts:profile', kwargs={'username': cls.writer}),
+            reverse('posts:follow_index'),
+        )
+
+    def count_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.reader_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_feed_query_count_does_not_depend_on_page_size(self):
+        """
+        Число запросов в ленте не зависит от количества постов на
+        странице, их авторов и групп.
+        """
+        single = {url: self.count_queries(url) for url in self.urls}
+        for i in range(NUM_OF_POSTS):
+            author = User.objects.create_user(
+                username=f'author{i}', first_name='Name', last_name=str(i)
+            )
+            Follow.objects.create(user=self.reader, author=author)
+            Post.objects.create(
+                text=f'post {i}', author=author, group=self.group
+            )
+            Post.objects.create(
+                text=f'writer {i}', author=self.writer, group=self.group
+            )
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), single[url])
+
+
+class CommentsPaginationTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='DarrylPhilbin')
+        cls.post = Post.objects.create(text='viral', author=cls.author)
+        cls.url = reverse('posts:post_detail', args=[cls.post.pk])
+
+    def setUp(self):
+        # Страницы гостей отдаются из кэша, считаем запросы самого view.
+        # Первый запрос кладет в кэш пользователя сессии.
+        self.client.force_login(self.author)
+        self.client.get(self.url)
+
+    def add_comments(self, count):
+        start = Comment.objects.count()
+        for i in range(start, start + count):
+            Comment.objects.create(
+                post=self.post,
+                author=User.objects.create_user(username=f'fan{i}'),
+                text=f'comment {i}'
+            )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+        return len(context)
+
+    def test_post_detail_query_count_is_fixed(self):
+        """
+        Число запросов страницы поста не зависит от числа
+        комментариев, а на странице не больше NUM_OF_COMMENTS штук.
+        """
+        self.add_comments(1)
+        single = self.count_queries()
+        self.add_comments(NUM_OF_COMMENTS + 5)
+        self.assertEqual(self.count_queries(), single)
+        response = self.client.get(self.url)
+        self.assertEqual(len(response.context['comments']), NUM_OF_COMMENTS)
+
+    def test_load_more_fragment(self):
+        """Следующие комментарии отдаются HTML-фрагментом и JSON."""
+        self.add_comments(NUM_OF_COMMENTS + 5)
+        cursor = self.client.get(self.url).context['comments'].next_cursor
+        fragment_url = reverse('posts:post_comments', args=[self.post.pk])
+        response = self.client.get(fragment_url, {'cursor': cursor})
+        self.assertTemplateUsed(response, 'posts/includes/comments.html')
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertEqual(len(response.context['comments']), 5)
+        response = self.client.get(
+            fragment_url, {'cursor': cursor}, HTTP_ACCEPT='application/json'
+        )
+        data = response.json()
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']],
+            [f'comment {i}' for i in range(4, -1, -1)]
+        )
+        self.assertIsNone(data['next_cursor'])
 
 
 class AdditionalVerification(TestCase):
@@ -357,9 +549,25 @@ class CacheTest(TestCase):
     def test_cash_index_page(self):
         """Тестирование кэша."""
         response_before = self.auth.get(reverse('posts:index'))
-        Post.objects.filter(author=self.user).delete()
+        Post.objects.filter(author=self.user).update(text='changed')
         response_after = self.auth.get(reverse('posts:index'))
         self.assertEqual(response_after.content, response_before.content)
         cache.clear()
         cache_cleared = self.auth.get(reverse('posts:index'))
         self.assertNotEqual(cache_cleared.content, response_before.content)
+
+    def test_cache_invalidated_on_change(self):
+        """Изменение поста, комментария или группы сбрасывает кэш лент."""
+        post = Post.objects.create(text='short-lived', author=self.user)
+        response_before = self.auth.get(reverse('posts:index'))
+        self.assertIn(post, response_before.context['page_obj'])
+        Comment.objects.create(post=post, author=self.user, text='hi')
+        response_after = self.auth.get(reverse('posts:index'))
+        self.assertNotEqual(
+            response_after.context['page_obj'].cache_key,
+            response_before.context['page_obj'].cache_key
+        )
+        Post.objects.filter(pk=post.pk).delete()
+        response_after = self.auth.get(reverse('posts:index'))
+        self.assertNotIn(post, response_after.context['page_obj'])
+        self.assertNotEqual(response_after.content, response_before.content)
@@ -0,0 +1,131 @@
+from django.db.models import F, Max
+
+from core import page_cache
+from core.tasks import task
+from yatube.settings import (TIMELINE_BACKFILL_SIZE, TIMELINE_BATCH_SIZE,
+                             TIMELINE_CELEBRITY_FOLLOWERS)
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+
+FOLLOW_FEED_ORDERING = ('-feed_date', '-feed_post')
+
+
+def _entries(user_ids, posts):
+    return [
+        TimelineEntry(
+            user_id=user_id,
+            author_id=post.author_id,
+            post_id=post.id,
+            pub_date=post.pub_date,
+        )
+        for user_id in user_ids
+        for post in posts
+    ]
+
+
+def _store(entries):
+    TimelineEntry.objects.bulk_create(
+        entries, batch_size=TIMELINE_BATCH_SIZE, ignore_conflicts=True
+    )
+
+
+def celebrities(author_ids):
+    """Авторы, у которых слишком много подписчиков для рассылки."""
+    return AuthorStats.objects.filter(
+        user_id__in=author_ids,
+        followers_count__gte=TIMELINE_CELEBRITY_FOLLOWERS,
+    ).values_list('user_id', flat=True)
+
+
+def fan_out(post):
+    """
+    Раскладывает новый пост в ленты подписчиков автора. Рассылка идет
+    в фоне, уже после сброса версий при сохранении поста, поэтому ETag
+    ленты каждого подписчика сбрасывается еще раз.
+    """
+    if celebrities([post.author_id]).exists():
+        return
+    followers = list(Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True))
+    _store(_entries(followers, [post]))
+    page_cache.purge(*(f'author-{user_id}' for user_id in followers))
+
+
+@task
+def deliver(post_id):
+    """Фоновая рассылка поста, если он еще существует."""
+    post = Post.objects.filter(pk=post_id).only(
+        'id', 'author_id', 'pub_date'
+    ).first()
+    if post is not None:
+        fan_out(post)
+
+
+def backfill(user_id, author_id):
+    """Добавляет в ленту последние посты автора после подписки."""
+    posts = Post.objects.filter(author_id=author_id).only(
+        'id', 'author_id', 'pub_date'
+    )[:TIMELINE_BACKFILL_SIZE]
+    _store(_entries([user_id], posts))
+
+
+@task
+def catch_up(user_id, author_id):
+    """
+    Фоновое заполнение ленты после подписки. Задача ставится после
+    коммита, чтобы INSERT ... SELECT не держал блокировку записи; если
+    подписку успели отменить, ничего не делает.
+    """
+    follows = Follow.objects.filter(user_id=user_id, author_id=author_id)
+    if not follows.exists():
+        return
+    backfill(user_id, author_id)
+    page_cache.purge(f'author-{user_id}')
+
+
+def trim(user_id, author_id):
+    """Убирает из ленты посты автора после отписки."""
+    TimelineEntry.objects.filter(user_id=user_id, author_id=author_id).delete()
+
+
+def rebuild():
+    """Заново заполняет ленты по всем подпискам, например после импорта."""
+    follows = Follow.objects.values_list('user_id', 'author_id')
+    for user_id, author_id in follows.iterator():
+        backfill(user_id, author_id)
+
+
+def pull_celebrities(user):
+    """
+    Дочитывает в ленту новые посты знаменитостей, которым рассылка
+    при публикации не делается.
+    """
+    authors = list(celebrities(
+        Follow.objects.filter(user=user).values('author_id')
+    ))
+    if not authors:
+        return
+    newest = TimelineEntry.objects.filter(
+        user=user, author_id__in=authors
+    ).aggregate(newest=Max('pub_date'))['newest']
+    posts = Post.objects.filter(author_id__in=authors).only(
+        'id', 'author_id', 'pub_date'
+    )
+    if newest is not None:
+        posts = posts.filter(pub_date__gt=newest)
+    _store(_entries([user.id], posts[:TIMELINE_BACKFILL_SIZE]))
+
+
+def follow_feed(user):
+    """
+    Лента подписок одним проходом по индексу (user, pub_date, post)
+    таблицы TimelineEntry.
+    """
+    pull_celebrities(user)
+    return Post.objects.for_feed().filter(
+        timeline_entries__user=user
+    ).annotate(
+        feed_date=F('timeline_entries__pub_date'),
+        feed_post=F('timeline_entries__post_id'),
+    )
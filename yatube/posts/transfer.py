@@ -0,0 +1,220 @@
+import csv
+import json
+import os
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from core import page_cache
+
+from . import counters, feed_cache, follow_graph, timeline
+from .models import Comment, Follow, Group, Post
+
+# Модели и поля в порядке колонок файла. Связи выгружаются по id,
+# поэтому загружать нужно по порядку: группы, посты, комментарии,
+# подписки; пользователи к этому моменту уже должны существовать.
+MODELS = {
+    'group': (Group, ('id', 'title', 'slug', 'description')),
+    'post': (
+        Post, ('id', 'text', 'pub_date', 'author_id', 'group_id', 'image')
+    ),
+    'comment': (Comment, ('id', 'post_id', 'author_id', 'text', 'created')),
+    'follow': (Follow, ('id', 'user_id', 'author_id')),
+}
+FORMATS = ('ndjson', 'csv')
+
+
+def guess_format(path):
+    return 'csv' if path.endswith('.csv') else 'ndjson'
+
+
+class Throughput:
+    """Счетчик обработанных строк и скорости."""
+
+    def __init__(self, done=0):
+        self.done = done
+        self.rows = 0
+        self.started = time.monotonic()
+
+    def add(self, rows):
+        self.done += rows
+        self.rows += rows
+
+    @property
+    def rate(self):
+        elapsed = time.monotonic() - self.started
+        return self.rows / elapsed if elapsed else 0.0
+
+    def __str__(self):
+        return f'{self.done} строк, {self.rate:.0f} строк/с'
+
+
+def _read_checkpoint(path):
+    try:
+        with open(path) as checkpoint:
+            return [int(value) for value in checkpoint.read().split()]
+    except FileNotFoundError:
+        return []
+
+
+def load_checkpoint(path):
+    values = _read_checkpoint(path)
+    return values[0] if values else 0
+
+
+def load_position(path):
+    """
+    Отметка выгрузки: последний выгруженный id и размер файла в этот
+    момент. Отметка без размера не дает безопасно дописать файл, и
+    выгрузка тогда начинается заново.
+    """
+    values = _read_checkpoint(path)
+    if len(values) != 2:
+        return 0, 0
+    return tuple(values)
+
+
+def save_checkpoint(path, *values):
+    """Записывает отметку атомарно, чтобы сбой не оставил ее пустой."""
+    with open(path + '.tmp', 'w') as checkpoint:
+        checkpoint.write(' '.join(str(value) for value in values))
+    os.replace(path + '.tmp', path)
+
+
+def _plain(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def read_rows(stream, fmt):
+    """Построчно читает записи файла в словари."""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+class RowWriter:
+    def __init__(self, stream, fmt, fields, header=True):
+        self.stream = stream
+        self.fields = fields
+        self.csv = None
+        if fmt == 'csv':
+            self.csv = csv.writer(stream)
+            if header:
+                self.csv.writerow(fields)
+
+    def write(self, row):
+        values = [_plain(value) for value in row]
+        if self.csv is not None:
+            self.csv.writerow(['' if value is None else value
+                               for value in values])
+        else:
+            self.stream.write(json.dumps(
+                dict(zip(self.fields, values)), ensure_ascii=False
+            ) + '\n')
+
+
+def export_rows(model_name, after=0, chunk_size=2000):
+    """
+    Строки модели по возрастанию id, начиная после after. Итератор
+    читает базу кусками по chunk_size и не держит в памяти всю таблицу.
+    """
+    model, fields = MODELS[model_name]
+    return model.objects.filter(pk__gt=after).order_by('pk').values_list(
+        *fields
+    ).iterator(chunk_size=chunk_size)
+
+
+def _converter(model, fields):
+    model_fields = {
+        field.attname: field for field in model._meta.concrete_fields
+    }
+
+    def convert(row):
+        values = {}
+        for name in fields:
+            field = model_fields[name]
+            value = row.get(name)
+            if value in (None, '') and field.null:
+                value = None
+            elif value is not None:
+                value = field.to_python(value)
+            values[name] = value
+        return model(**values)
+    return convert
+
+
+@contextmanager
+def _keep_dates(model):
+    """
+    bulk_create подставляет текущее время в поля auto_now_add, а при
+    импорте нужны даты из файла.
+    """
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def import_rows(model_name, rows, batch_size, skip=0, on_batch=None):
+    """
+    Загружает записи пачками через bulk_create, каждая пачка - в своей
+    транзакции. Первые skip записей пропускаются, после каждой пачки
+    вызывается on_batch с числом обработанных записей. Уже существующие
+    id пропускаются, так что повторный запуск безопасен.
+    """
+    model, fields = MODELS[model_name]
+    convert = _converter(model, fields)
+    rows = islice(rows, skip, None)
+    done = skip
+    with _keep_dates(model):
+        while True:
+            batch = [convert(row) for row in islice(rows, batch_size)]
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch, ignore_conflicts=True)
+            done += len(batch)
+            if on_batch is not None:
+                on_batch(done, len(batch))
+    _reset_sequence(model)
+    return done
+
+
+def _reset_sequence(model):
+    """После вставки с явными id сдвигает счетчик первичного ключа."""
+    statements = connection.ops.sequence_reset_sql(no_style(), [model])
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def finish_import(model_name):
+    """
+    bulk_create не отправляет сигналы, поэтому после загрузки
+    пересчитываются зависящие от модели счетчики и ленты.
+    """
+    if model_name in ('post', 'follow'):
+        counters.reconcile_users()
+        timeline.rebuild()
+    if model_name == 'follow':
+        follow_graph.invalidate_all()
+    if model_name == 'comment':
+        counters.reconcile_posts()
+    feed_cache.bump()
+    page_cache.purge(page_cache.ALL)
@@ -1,32 +1,63 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.http import is_safe_url
+from django.views.decorators.http import require_POST
 
-from yatube.settings import NUM_OF_POSTS
+from core import page_cache, write_queue
+from yatube.settings import NUM_OF_COMMENTS, NUM_OF_FOLLOWS, NUM_OF_POSTS
 
+from . import feed_cache, follow_graph, follows, images, timeline
+from .conditional import (conditional, follow_etag, follow_list_etag,
+                          group_etag, index_etag, post_etag, profile_etag)
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post, User
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+from .paginators import CursorPaginator
+from .search import get_backend
 
 
-def paginator_func(request, posts):
-    paginator = Paginator(posts, NUM_OF_POSTS)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+def paginator_func(request, posts, ordering=('-pub_date', '-id'),
+                   cache_key=None):
+    paginator = CursorPaginator(posts, NUM_OF_POSTS, ordering)
+    cursor = request.GET.get('cursor')
+    if cache_key is None:
+        return paginator.get_page(cursor)
+    return feed_cache.get_page(paginator, cursor, *cache_key)
 
 
+def comments_page(request, post_id):
+    comments = Comment.objects.filter(post_id=post_id).select_related(
+        'author'
+    ).only('id', 'text', 'created', 'post', 'author__username')
+    paginator = CursorPaginator(
+        comments, NUM_OF_COMMENTS, ordering=('-created', '-id')
+    )
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+@conditional(index_etag)
 def index(request):
-    post_list = Post.objects.all()
-    page_obj = paginator_func(request, post_list)
+    post_list = Post.objects.for_feed()
+    page_obj = paginator_func(request, post_list, cache_key=('index',))
+    page_cache.tag(request, 'index', *feed_cache.surrogate_keys(page_obj))
     context = {
         'page_obj': page_obj,
     }
     return render(request, 'posts/index.html', context)
 
 
+@conditional(group_etag)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = paginator_func(request, posts)
+    posts = group.posts.for_feed()
+    page_obj = paginator_func(
+        request, posts, cache_key=('group_posts', group.slug)
+    )
+    page_cache.tag(
+        request, f'group-{group.pk}', *feed_cache.surrogate_keys(page_obj)
+    )
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -34,16 +65,22 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@conditional(profile_etag)
 def profile(request, username):
-    writer = get_object_or_404(User, username=username)
-    writers_posts = writer.posts.all()
-    page_obj = paginator_func(request, writers_posts)
+    writer = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    writers_posts = writer.posts.for_feed()
+    page_obj = paginator_func(
+        request, writers_posts, cache_key=('profile', writer.pk)
+    )
+    page_cache.tag(
+        request, f'author-{writer.pk}', *feed_cache.surrogate_keys(page_obj)
+    )
     param_follow = True if writer != request.user else False
-    if (request.user.is_authenticated and Follow.objects.filter(
-            user=request.user, author=writer)):
-        following = True
-    else:
-        following = False
+    following = request.user.is_authenticated and follow_graph.is_following(
+        request.user.pk, writer.pk
+    )
 
     context = {
         'writer': writer,
@@ -54,11 +91,76 @@ def profile(request, username):
     return render(request, 'posts/profile.html', context)
 
 
+def follow_list(request, username, person, title):
+    """
+    Страница подписчиков или подписок автора. Кнопки "подписаться"
+    строятся по закэшированному набору подписок зрителя, без запроса
+    на каждого человека в списке.
+    """
+    writer = get_object_or_404(User, username=username)
+    follows = Follow.objects.filter(**{
+        'author' if person == 'user' else 'user': writer
+    }).select_related(person).only(
+        'id',
+        person,
+        f'{person}__username',
+        f'{person}__first_name',
+        f'{person}__last_name',
+    )
+    paginator = CursorPaginator(follows, NUM_OF_FOLLOWS, ('-id',))
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    people = [getattr(follow, person) for follow in page_obj]
+    followed = set()
+    if request.user.is_authenticated:
+        followed = follow_graph.following_among(
+            request.user.pk, [other.pk for other in people]
+        )
+    page_cache.tag(request, f'author-{writer.pk}')
+    context = {
+        'writer': writer,
+        'title': title,
+        'page_obj': page_obj,
+        'people': [(other, other.pk in followed) for other in people],
+    }
+    return render(request, 'posts/follow_list.html', context)
+
+
+@conditional(follow_list_etag)
+def profile_followers(request, username):
+    return follow_list(request, username, 'user', 'Подписчики')
+
+
+@conditional(follow_list_etag)
+def profile_following(request, username):
+    return follow_list(request, username, 'author', 'Подписки')
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    results = get_backend().search(query)
+    paginator = Paginator(results, NUM_OF_POSTS)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@conditional(post_etag)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group').prefetch_related(
+            'image_variants'
+        ),
+        id=post_id
+    )
     first_symbols = post.text[:30]
     form = CommentForm(request.POST or None)
-    comments = post.comments.all()
+    comments = comments_page(request, post.id)
+    page_cache.tag(
+        request, f'comments-{post.pk}', *feed_cache.surrogate_keys([post])
+    )
     context = {
         'post': post,
         'first_symbols': first_symbols,
@@ -68,6 +170,29 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+def post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), id=post_id)
+    comments = comments_page(request, post.id)
+    if 'application/json' in request.META.get('HTTP_ACCEPT', ''):
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created': comment.created,
+                }
+                for comment in comments
+            ],
+            'next_cursor': comments.next_cursor,
+        })
+    context = {
+        'post': post,
+        'comments': comments,
+    }
+    return render(request, 'posts/includes/comments.html', context)
+
+
 @login_required
 def post_create(request):
     if request.method == 'POST':
@@ -76,6 +201,8 @@ def post_create(request):
             new_post = form.save(commit=False)
             new_post.author = request.user
             new_post.save()
+            if new_post.image:
+                images.schedule(new_post)
             return redirect('posts:profile', username=request.user)
         return render(request, 'posts/create_post.html', {'form': form})
     form = PostForm()
@@ -98,6 +225,8 @@ def post_edit(request, post_id):
     )
     if form.is_valid():
         form.save()
+        if 'image' in form.changed_data:
+            images.schedule(editable_post)
         return redirect('posts:post_detail', post_id)
 
     context = {
@@ -116,14 +245,17 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
-        comment.save()
+        write_queue.run(comment.save)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
+@conditional(follow_etag)
 def follow_index(request):
-    following = Post.objects.filter(author__following__user=request.user)
-    page_obj = paginator_func(request, following)
+    following = timeline.follow_feed(request.user)
+    page_obj = paginator_func(
+        request, following, timeline.FOLLOW_FEED_ORDERING
+    )
     context = {
         'page_obj': page_obj
     }
@@ -132,15 +264,82 @@ def follow_index(request):
 
 @login_required
 def profile_follow(request, username):
-    writer = get_object_or_404(User, username=username)
-    if writer != request.user:
-        Follow.objects.get_or_create(user=request.user, author=writer)
+    writer = get_object_or_404(User.objects.only('id'), username=username)
+    write_queue.run(follows.follow, request.user.pk, writer.pk)
     return redirect('posts:profile', username=username)
 
 
 @login_required
 def profile_unfollow(request, username):
-    writer = get_object_or_404(User, username=username)
-    if writer != request.user:
-        Follow.objects.filter(user=request.user, author=writer).delete()
+    writer = get_object_or_404(User.objects.only('id'), username=username)
+    write_queue.run(follows.unfollow, request.user.pk, writer.pk)
     return redirect('posts:profile', username=username)
+
+
+def wants_json(request):
+    return (
+        'application/json' in request.META.get('HTTP_ACCEPT', '')
+        or request.is_ajax()
+    )
+
+
+def back_url(request):
+    """Страница, с которой отправлена форма, если она на этом сайте."""
+    next_url = request.POST.get('next', '')
+    if not is_safe_url(next_url, allowed_hosts={request.get_host()},
+                       require_https=request.is_secure()):
+        return reverse('posts:follow_index')
+    return next_url
+
+
+def follow_response(request, author_id, following):
+    """
+    Ответ на подписку или отписку: JSON для приложений, кнопка для
+    HTMX или возврат на страницу, с которой отправлена форма.
+    """
+    if wants_json(request):
+        followers_count = AuthorStats.objects.filter(
+            user_id=author_id
+        ).values_list('followers_count', flat=True).first()
+        return JsonResponse({
+            'author': author_id,
+            'following': following,
+            'followers_count': followers_count or 0,
+        })
+    if request.META.get('HTTP_HX_REQUEST'):
+        return render(request, 'posts/includes/follow_button.html', {
+            'author_id': author_id,
+            'following': following,
+        })
+    return redirect(back_url(request))
+
+
+def _change_follow(request, author_id, handler, following):
+    if author_id == request.user.pk:
+        # Форма со страницы просто возвращается обратно, как в
+        # profile_follow; приложению нужна ошибка.
+        if not wants_json(request):
+            return redirect(back_url(request))
+        return JsonResponse(
+            {'error': 'Нельзя подписаться на себя'}, status=400
+        )
+    changed = write_queue.run(handler, request.user.pk, author_id)
+    if not changed and not User.objects.filter(pk=author_id).exists():
+        raise Http404
+    return follow_response(request, author_id, following)
+
+
+@login_required
+@require_POST
+def follow_author(request, author_id):
+    """
+    Подписка по id автора одним INSERT: повторный запрос ничего не
+    меняет и отвечает так же.
+    """
+    return _change_follow(request, author_id, follows.follow, True)
+
+
+@login_required
+@require_POST
+def unfollow_author(request, author_id):
+    return _change_follow(request, author_id, follows.unfollow, False)
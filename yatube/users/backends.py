@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from core import metrics
+from yatube.settings import AUTH_USER_CACHE_TIMEOUT
+
+User = get_user_model()
+
+# Поля пользователя сессии, которые хранятся в кэше. Хэша пароля среди
+# них нет: для проверки сессии хранится производная от него подпись,
+# а сам пароль дочитывается из базы, только если он понадобился.
+CACHED_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname != 'password'
+)
+
+
+def user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def pack(user):
+    return {
+        'fields': {name: getattr(user, name) for name in CACHED_FIELDS},
+        'session_hash': user.get_session_auth_hash(),
+    }
+
+
+def unpack(entry):
+    fields = entry['fields']
+    user = User.from_db(None, list(fields), list(fields.values()))
+
+    def get_session_auth_hash():
+        # После чтения или смены пароля подпись считается заново.
+        if 'password' in user.__dict__:
+            return User.get_session_auth_hash(user)
+        return entry['session_hash']
+
+    user.get_session_auth_hash = get_session_auth_hash
+    return user
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который берет пользователя сессии из кэша, а не из
+    auth_user на каждом запросе. Запись сбрасывается сигналом при
+    любом сохранении пользователя, в том числе при смене пароля и
+    обновлении last_login. Изменения в обход save (queryset.update)
+    сигнал не видит, поэтому запись живет недолго:
+    AUTH_USER_CACHE_TIMEOUT ограничивает, сколько они остаются
+    незамеченными.
+    """
+
+    def get_user(self, user_id):
+        key = user_key(user_id)
+        entry = cache.get(key)
+        metrics.cache_hit(entry is not None)
+        if entry is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, pack(user), AUTH_USER_CACHE_TIMEOUT)
+        else:
+            user = unpack(entry)
+        return user if self.user_can_authenticate(user) else None
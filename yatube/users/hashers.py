@@ -0,0 +1,70 @@
+import threading
+from contextlib import contextmanager
+
+from django.contrib.auth import hashers
+
+from yatube.settings import (PASSWORD_ARGON2, PASSWORD_BCRYPT_ROUNDS,
+                             PASSWORD_HASHING_CONCURRENCY,
+                             PASSWORD_HASHING_WAIT, PASSWORD_PBKDF2_ITERATIONS)
+
+_slots = threading.BoundedSemaphore(PASSWORD_HASHING_CONCURRENCY)
+_local = threading.local()
+
+
+class HashingBusy(Exception):
+    """Все слоты хэширования заняты дольше PASSWORD_HASHING_WAIT."""
+
+
+@contextmanager
+def slot():
+    """
+    Не дает хэшированию паролей занять больше PASSWORD_HASHING_CONCURRENCY
+    потоков процесса: всплеск входов ждет своей очереди, а не отбирает
+    процессор у лент. Вложенные вызовы в том же потоке слот не берут.
+    """
+    depth = getattr(_local, 'depth', 0)
+    if not depth and not _slots.acquire(timeout=PASSWORD_HASHING_WAIT):
+        raise HashingBusy
+    _local.depth = depth + 1
+    try:
+        yield
+    finally:
+        _local.depth = depth
+        if not depth:
+            _slots.release()
+
+
+class BoundedMixin:
+    def encode(self, *args, **kwargs):
+        with slot():
+            return super().encode(*args, **kwargs)
+
+    def verify(self, *args, **kwargs):
+        with slot():
+            return super().verify(*args, **kwargs)
+
+
+class PBKDF2PasswordHasher(BoundedMixin, hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2 с числом итераций из настроек. Алгоритм тот же, поэтому
+    старые хэши проверяются, а при входе пересчитываются с новым числом.
+    """
+    iterations = PASSWORD_PBKDF2_ITERATIONS
+
+
+class PBKDF2SHA1PasswordHasher(BoundedMixin,
+                               hashers.PBKDF2SHA1PasswordHasher):
+    iterations = PASSWORD_PBKDF2_ITERATIONS
+
+
+class Argon2PasswordHasher(BoundedMixin, hashers.Argon2PasswordHasher):
+    """Нужен пакет argon2-cffi."""
+    time_cost = PASSWORD_ARGON2['time_cost']
+    memory_cost = PASSWORD_ARGON2['memory_cost']
+    parallelism = PASSWORD_ARGON2['parallelism']
+
+
+class BCryptSHA256PasswordHasher(BoundedMixin,
+                                 hashers.BCryptSHA256PasswordHasher):
+    """Нужен пакет bcrypt."""
+    rounds = PASSWORD_BCRYPT_ROUNDS
@@ -0,0 +1,50 @@
+import time
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+from yatube.settings import PASSWORD_HASHING_CONCURRENCY
+
+PASSWORD = 'Benchmark-password-2021'
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет хэшеры паролей из PASSWORD_HASHERS: время проверки '
+        'пароля и число входов в секунду на ядро'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rounds', type=int, default=10,
+            help='Сколько раз проверять пароль каждым хэшером',
+        )
+
+    def handle(self, *args, **options):
+        rounds = max(options['rounds'], 1)
+        for number, hasher in enumerate(get_hashers()):
+            try:
+                encoded = hasher.encode(PASSWORD, hasher.salt())
+            except ValueError as error:
+                self.stdout.write(
+                    f'{hasher.algorithm:<20} недоступен: {error}'
+                )
+                continue
+            # Процессорное время, а не время на часах: это и есть
+            # нагрузка на одно ядро.
+            started = time.process_time()
+            for _ in range(rounds):
+                hasher.verify(PASSWORD, encoded)
+            elapsed = (time.process_time() - started) / rounds
+            rate = 1 / elapsed if elapsed else float('inf')
+            mark = ' (основной)' if number == 0 else ''
+            self.stdout.write(
+                f'{hasher.algorithm:<20} {elapsed * 1000:8.1f} мс '
+                f'{rate:8.1f} входов/с на ядро{mark}'
+            )
+            if number == 0:
+                limit = rate * PASSWORD_HASHING_CONCURRENCY
+                self.stdout.write(
+                    f'{"":<20} не больше {limit:.1f} входов/с на процесс '
+                    f'при {PASSWORD_HASHING_CONCURRENCY} слотах хэширования'
+                )
@@ -0,0 +1,26 @@
+from django.http import HttpResponse
+
+from .hashers import HashingBusy
+
+
+class HashingBusyMiddleware:
+    """
+    Отвечает 503, если пароль не дождался свободного слота хэширования.
+    Стоит в MIDDLEWARE, а не на отдельных view: authenticate() и смену
+    пароля вызывают и вход в админку, и формы сторонних приложений.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingBusy):
+            return None
+        response = HttpResponse(
+            'Сервер перегружен, попробуйте через минуту', status=503
+        )
+        response['Retry-After'] = '60'
+        return response
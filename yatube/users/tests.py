@@ -0,0 +1,184 @@
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth import hashers as django_hashers
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from yatube.settings import (AUTH_USER_CACHE_TIMEOUT,
+                             PASSWORD_PBKDF2_ITERATIONS)
+
+from . import hashers
+from .backends import user_key
+
+User = get_user_model()
+
+
+class CachedSessionUserTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='Meredith', password='Palmer-2005'
+        )
+        cls.url = reverse('about:author')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_session_engine_from_setting(self):
+        self.assertEqual(
+            settings.SESSION_ENGINE,
+            'django.contrib.sessions.backends.cached_db',
+        )
+
+    def test_anonymous_request_does_not_query(self):
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+    def test_authenticated_request_uses_cache(self):
+        """Сессия и пользователь после первого запроса берутся из кэша."""
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(user_key(self.user.pk)))
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_save_invalidates_cached_user(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        User.objects.get(pk=self.user.pk).save()
+        self.assertIsNone(cache.get(user_key(self.user.pk)))
+
+    def test_password_change_ends_other_sessions(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('Another-2006')
+        user.save()
+        response = self.client.get(self.url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_cache_does_not_hold_password_hash(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        entry = cache.get(user_key(self.user.pk))
+        self.assertNotIn('password', entry['fields'])
+        self.assertNotIn(self.user.password, str(entry))
+
+    def test_inactive_user_is_logged_out(self):
+        """Блокировка в обход save видна после истечения записи."""
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        later = time.time() + AUTH_USER_CACHE_TIMEOUT + 1
+        with mock.patch('time.time', return_value=later):
+            response = self.client.get(self.url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_cached_user_can_change_password(self):
+        """Пароль пользователя из кэша дочитывается из базы."""
+        self.client.force_login(self.user)
+        self.client.get(self.url)
+        response = self.client.post(reverse('users:password_change_form'), {
+            'old_password': 'Palmer-2005',
+            'new_password1': 'Another-2006',
+            'new_password2': 'Another-2006',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(
+            User.objects.get(pk=self.user.pk).check_password('Another-2006')
+        )
+        response = self.client.get(self.url)
+        self.assertTrue(response.context['user'].is_authenticated)
+
+
+class PasswordHashingTest(TestCase):
+    password = 'Scranton-1999'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Toby')
+
+    def store(self, encoded):
+        User.objects.filter(pk=self.user.pk).update(password=encoded)
+
+    def stored(self):
+        return User.objects.get(pk=self.user.pk).password
+
+    def test_profile_puts_preferred_hasher_first(self):
+        self.assertEqual(
+            settings.PASSWORD_HASHERS[0], 'users.hashers.PBKDF2PasswordHasher'
+        )
+
+    def test_old_hashes_are_upgraded_on_login(self):
+        old_hashes = (
+            django_hashers.PBKDF2PasswordHasher().encode(
+                self.password, 'salt', iterations=1000
+            ),
+            django_hashers.PBKDF2SHA1PasswordHasher().encode(
+                self.password, 'salt'
+            ),
+        )
+        for encoded in old_hashes:
+            with self.subTest(encoded=encoded):
+                self.store(encoded)
+                self.assertTrue(self.client.login(
+                    username='Toby', password=self.password
+                ))
+                self.assertTrue(self.stored().startswith(
+                    f'pbkdf2_sha256${PASSWORD_PBKDF2_ITERATIONS}$'
+                ))
+
+    @mock.patch.object(hashers, '_slots', threading.BoundedSemaphore(1))
+    def test_nested_hashing_takes_one_slot(self):
+        hasher = hashers.PBKDF2PasswordHasher()
+        encoded = hasher.encode(self.password, 'salt')
+        self.assertTrue(hasher.verify(self.password, encoded))
+
+    @mock.patch.object(hashers, 'PASSWORD_HASHING_WAIT', 0.01)
+    @mock.patch.object(hashers, '_slots', threading.BoundedSemaphore(1))
+    def test_busy_hashing_returns_503(self):
+        self.store(django_hashers.PBKDF2PasswordHasher().encode(
+            self.password, 'salt', iterations=1000
+        ))
+        held, release = threading.Event(), threading.Event()
+
+        def hold():
+            with hashers.slot():
+                held.set()
+                release.wait(5)
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        held.wait(5)
+        try:
+            # Вход в админку зовет тот же authenticate() мимо наших view.
+            responses = {
+                url: self.client.post(
+                    reverse(url),
+                    {'username': 'Toby', 'password': self.password},
+                )
+                for url in ('users:login', 'admin:login')
+            }
+        finally:
+            release.set()
+            worker.join()
+        for url, response in responses.items():
+            with self.subTest(url=url):
+                self.assertEqual(response.status_code, 503)
+                self.assertEqual(response['Retry-After'], '60')
+
+    def test_benchmark_reports_logins_per_core(self):
+        out = StringIO()
+        call_command('hashing_benchmark', rounds=1, stdout=out)
+        self.assertIn('pbkdf2_sha256', out.getvalue())
+        self.assertIn('входов/с на ядро', out.getvalue())
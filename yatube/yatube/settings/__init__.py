@@ -0,0 +1,14 @@
+"""
+Настройки выбираются переменной окружения DJANGO_ENV:
+dev (по умолчанию) для разработки или prod для боевого сервера.
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+if os.getenv('DJANGO_ENV', 'dev') == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
@@ -0,0 +1,324 @@
+"""
+Django settings for yatube project: common part for every environment.
+
+Generated by 'django-admin startproject' using Django 2.2.19.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/2.2/howto/deployment/checklist/
+SECRET_KEY = os.getenv('SECRET_KEY')
+# SECURITY WARNING: keep the secret key used in production secret!
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = [
+    'localhost',
+    '127.0.0.1',
+    '[::1]',
+    'testserver',
+    'www.arnet.pythonanywhere.com',
+    'arnet.pythonanywhere.com',
+]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'about.apps.AboutConfig',
+    'core.apps.CoreConfig',
+    'users.apps.UsersConfig',
+    'posts.apps.PostsConfig',
+    'api.apps.ApiConfig',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+]
+
+MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.HashingBusyMiddleware',
+    'core.middleware.ReplicaMiddleware',
+    'core.page_cache.PageCacheMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'core.templates_backend.TimedDjangoTemplates',
+        'DIRS': [os.path.join(BASE_DIR, 'templates')],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'core.context_processors.year.year',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    }
+}
+
+# Реплики для чтения: пути к файлам SQLite через запятую в
+# DATABASE_REPLICAS. Сама репликация (например, Litestream) настраивается
+# отдельно, в тестах реплики смотрят в тестовую основную базу.
+DATABASE_REPLICAS = [
+    name for name in os.getenv('DATABASE_REPLICAS', '').split(',') if name
+]
+DATABASES.update({
+    f'replica{number}': {
+        **DATABASES['default'],
+        'NAME': name,
+        'TEST': {'MIRROR': 'default'},
+    }
+    for number, name in enumerate(DATABASE_REPLICAS, 1)
+})
+REPLICA_ALIASES = [alias for alias in DATABASES if alias != 'default']
+REPLICA_APPS = ('posts', 'auth')
+REPLICA_STICKY_SECONDS = 10
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Параметры каждого нового соединения с SQLite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Очередь, в которой один поток процесса выполняет мелкие записи
+# (комментарии, подписки) пачками в одной транзакции.
+WRITE_QUEUE_ENABLED = os.getenv('WRITE_QUEUE_ENABLED') == '1'
+WRITE_QUEUE_BATCH_SIZE = 100
+WRITE_QUEUE_TIMEOUT = 10
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+# Хэширование паролей. Первый хэшер профиля шифрует новые пароли,
+# остальные проверяют старые хэши, которые пересчитываются при входе.
+# Для argon2 нужен пакет argon2-cffi, для bcrypt - bcrypt.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': ('PBKDF2', 'Argon2', 'BCryptSHA256', 'PBKDF2SHA1'),
+    'argon2': ('Argon2', 'PBKDF2', 'BCryptSHA256', 'PBKDF2SHA1'),
+    'bcrypt': ('BCryptSHA256', 'PBKDF2', 'Argon2', 'PBKDF2SHA1'),
+}
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_HASHERS = [
+    f'users.hashers.{name}PasswordHasher'
+    for name in PASSWORD_HASHER_PROFILES[PASSWORD_HASHER]
+]
+PASSWORD_PBKDF2_ITERATIONS = int(
+    os.getenv('PASSWORD_PBKDF2_ITERATIONS', 150000)
+)
+PASSWORD_ARGON2 = {'time_cost': 2, 'memory_cost': 512, 'parallelism': 2}
+PASSWORD_BCRYPT_ROUNDS = 12
+# Сколько потоков процесса одновременно хэшируют пароли и сколько
+# секунд запрос ждет свободного слота, прежде чем получить 503.
+PASSWORD_HASHING_CONCURRENCY = max((os.cpu_count() or 2) // 2, 1)
+PASSWORD_HASHING_WAIT = 5
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = "ru"
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+
+STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+
+LOGIN_URL = 'users:login'
+
+LOGIN_REDIRECT_URL = 'posts:index'
+# LOGOUT_REDIRECT_URL = 'posts:index'
+
+# Письма отправляет воркер очереди задач через TASKS_EMAIL_BACKEND.
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+TASKS_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+NUM_OF_POSTS = 10
+
+NUM_OF_COMMENTS = 20
+
+NUM_OF_FOLLOWS = 20
+
+FEED_CACHE_TIMEOUT = 60 * 60 * 3
+
+PAGE_CACHE_TIMEOUT = 60 * 10
+
+FOLLOW_GRAPH_TIMEOUT = 60 * 60
+
+TIMELINE_BACKFILL_SIZE = 1000
+# SQLite вставляет пачку одним составным SELECT, в нем не больше 500 строк.
+TIMELINE_BATCH_SIZE = 500
+TIMELINE_CELEBRITY_FOLLOWERS = 10000
+
+TRANSFER_BATCH_SIZE = 5000
+
+# JSON API: размер страницы по умолчанию и верхняя граница ?limit=.
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Варианты картинок поста, которые готовятся в фоне после сохранения:
+# рамка по умолчанию, атрибут sizes и качество сжатия для каждой ширины.
+POST_IMAGE_VARIANTS = {
+    'card': {
+        'size': (960, 339),
+        'sizes': '(max-width: 992px) 100vw, 960px',
+        'widths': {480: 70, 960: 75, 1440: 65},
+    },
+}
+POST_IMAGE_FORMATS = ('webp', 'jpeg')
+
+# Очередь фоновых задач в базе (manage.py run_tasks). С TASKS_EAGER
+# задачи выполняются сразу при постановке, без воркера. Повторные
+# попытки идут через TASKS_RETRY_DELAY * 2 ** (попытка - 1) секунд.
+# Упавшие задачи хранятся TASKS_FAILED_RETENTION секунд.
+TASKS_EAGER = os.getenv('TASKS_EAGER', '') == '1'
+TASKS_MAX_ATTEMPTS = 5
+TASKS_RETRY_DELAY = 10
+TASKS_RETRY_MAX_DELAY = 60 * 60
+TASKS_LOCK_TIMEOUT = 60 * 10
+TASKS_POLL_INTERVAL = 1
+TASKS_BATCH_SIZE = 10
+TASKS_FAILED_RETENTION = 60 * 60 * 24 * 7
+
+# Поиск по постам: индекс FTS5 для SQLite или LIKE для остальных баз.
+# Без SEARCH_BACKEND бэкенд выбирается по connection.vendor, а для баз,
+# которых нет в SEARCH_BACKENDS, берется 'basic'.
+SEARCH_BACKENDS = {
+    'sqlite': 'posts.search.SQLiteSearchBackend',
+    'basic': 'posts.search.BasicSearchBackend',
+}
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND')
+SEARCH_MAX_RESULTS = 1000
+SEARCH_MAX_TERMS = 10
+
+# Общий для всех воркеров кэш задается переменными окружения, например
+# CACHE_BACKEND=file CACHE_LOCATION=/var/tmp/yatube_cache
+# или CACHE_BACKEND=memcached CACHE_LOCATION=127.0.0.1:11211.
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'memcached': 'django.core.cache.backends.memcached.MemcachedCache',
+    'redis': 'django_redis.cache.RedisCache',
+}
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS.get(CACHE_BACKEND, CACHE_BACKEND),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            os.path.join(BASE_DIR, 'cache') if CACHE_BACKEND == 'file' else ''
+        ),
+    }
+}
+
+CACHE_LOCK_TIMEOUT = 10
+CACHE_LOCK_WAIT = 2
+
+# Хранилище сессий: cached_db читает сессию из кэша и пишет в базу,
+# signed_cookies хранит ее в подписанной cookie. Для cached_db и cache
+# при нескольких воркерах нужен общий кэш (CACHE_BACKEND выше).
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'cached_db')
+SESSION_ENGINE = SESSION_ENGINES.get(SESSION_BACKEND, SESSION_BACKEND)
+
+# Пользователь сессии берется из кэша и сбрасывается при сохранении.
+# ModelBackend остается для сессий, открытых до его появления. Время
+# жизни записи ограничивает, сколько не видны изменения в обход save,
+# например блокировка через queryset.update(is_active=False).
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+AUTH_USER_CACHE_TIMEOUT = 60
+
+# Метрики запросов: границы гистограммы времени ответа в секундах,
+# заголовок Server-Timing и токен для /metrics.
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+METRICS_SERVER_TIMING = True
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
@@ -0,0 +1,26 @@
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, MIDDLEWARE, TEMPLATES
+
+DEBUG = False
+
+# Соединение с базой живет между запросами, а не открывается на каждый.
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = int(os.getenv('CONN_MAX_AGE', 600))
+
+# Шаблоны читаются и разбираются один раз на процесс.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# GZip стоит раньше ConditionalGet, чтобы ETag считался по несжатому
+# ответу; оба - до middleware, которые меняют тело ответа.
+MIDDLEWARE = MIDDLEWARE[:2] + [
+    'django.middleware.gzip.GZipMiddleware',
+    'django.middleware.http.ConditionalGetMiddleware',
+] + MIDDLEWARE[2:]